@@ -0,0 +1,31 @@
+"""add timers.is_epoch
+
+Revision ID: 3f2b9c7d1a4e
+Revises: 811e0a1ab467
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2b9c7d1a4e'
+down_revision: Union[str, None] = '811e0a1ab467'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'timers',
+        sa.Column('is_epoch', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('timers', 'is_epoch')
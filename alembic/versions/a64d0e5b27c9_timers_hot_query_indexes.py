@@ -0,0 +1,49 @@
+"""timers hot query indexes
+
+Revision ID: a64d0e5b27c9
+Revises: 3f2b9c7d1a4e
+Create Date: 2026-10-18 10:03:47.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a64d0e5b27c9'
+down_revision: Union[str, None] = '3f2b9c7d1a4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Перед уникальным ограничением оставляем по одному (самому позднему) таймеру на босса в чате
+    op.execute(
+        """
+        DELETE FROM timers
+        WHERE EXISTS (
+            SELECT 1 FROM timers AS newer
+            WHERE newer.chat_id = timers.chat_id
+              AND newer.boss_name = timers.boss_name
+              AND (
+                newer.respawn_time > timers.respawn_time
+                OR (newer.respawn_time = timers.respawn_time AND newer.timer_id > timers.timer_id)
+              )
+        )
+        """
+    )
+    with op.batch_alter_table('timers') as batch_op:
+        batch_op.create_unique_constraint('uq_timers_chat_id_boss_name', ['chat_id', 'boss_name'])
+    op.create_index('ix_timers_chat_id_respawn_time', 'timers', ['chat_id', 'respawn_time'], unique=False)
+    op.create_index(op.f('ix_timers_respawn_time'), 'timers', ['respawn_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_timers_respawn_time'), table_name='timers')
+    op.drop_index('ix_timers_chat_id_respawn_time', table_name='timers')
+    with op.batch_alter_table('timers') as batch_op:
+        batch_op.drop_constraint('uq_timers_chat_id_boss_name', type_='unique')
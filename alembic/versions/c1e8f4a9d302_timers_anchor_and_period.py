@@ -0,0 +1,46 @@
+"""timers anchor and period
+
+Revision ID: c1e8f4a9d302
+Revises: a64d0e5b27c9
+Create Date: 2026-10-18 11:20:05.918344
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e8f4a9d302'
+down_revision: Union[str, None] = 'a64d0e5b27c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('timers', sa.Column('respawn_period', sa.Integer(), nullable=True))
+    # До этой серии /set и /all_start писали одинаковые строки (is_epoch ещё не было),
+    # отличить разовые таймеры /all_start от циклических /set нельзя.
+    # LEGACY_TIMERS_ONE_SHOT=1 оставляет все старые таймеры разовыми
+    if os.getenv('LEGACY_TIMERS_ONE_SHOT', '0') not in ('0', 'false', 'False', ''):
+        return
+    # Иначе все старые таймеры становятся циклическими: интервал босса + 60 секунд, как раньше в set_timer
+    op.execute(
+        """
+        UPDATE timers
+        SET respawn_period = (
+            SELECT boss_respawns.time_to_respawn * 3600 + 60
+            FROM boss_respawns
+            WHERE boss_respawns.boss_name = timers.boss_name
+        )
+        WHERE is_epoch = false
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('timers', 'respawn_period')
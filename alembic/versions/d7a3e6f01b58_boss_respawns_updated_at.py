@@ -0,0 +1,55 @@
+"""boss_respawns updated_at
+
+Revision ID: d7a3e6f01b58
+Revises: c1e8f4a9d302
+Create Date: 2026-10-18 13:02:41.337190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3e6f01b58'
+down_revision: Union[str, None] = 'c1e8f4a9d302'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boss_respawns', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE boss_respawns SET updated_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table('boss_respawns') as batch_op:
+        batch_op.alter_column('updated_at', nullable=False, server_default=sa.func.now())
+
+    # Бот перечитывает интервалы, когда меняется max(updated_at), поэтому
+    # правки таблицы вручную тоже должны обновлять updated_at
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            """
+            CREATE FUNCTION boss_respawns_touch_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at = now();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER boss_respawns_touch_updated_at
+            BEFORE UPDATE ON boss_respawns
+            FOR EACH ROW EXECUTE FUNCTION boss_respawns_touch_updated_at()
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER boss_respawns_touch_updated_at ON boss_respawns")
+        op.execute("DROP FUNCTION boss_respawns_touch_updated_at()")
+    op.drop_column('boss_respawns', 'updated_at')
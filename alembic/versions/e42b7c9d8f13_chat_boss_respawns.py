@@ -0,0 +1,36 @@
+"""chat boss respawns
+
+Revision ID: e42b7c9d8f13
+Revises: d7a3e6f01b58
+Create Date: 2026-10-18 13:48:12.604215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e42b7c9d8f13'
+down_revision: Union[str, None] = 'd7a3e6f01b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'chat_boss_respawns',
+        sa.Column('chat_id', sa.String(), nullable=False),
+        sa.Column('boss_name', sa.String(), nullable=False),
+        sa.Column('time_to_respawn', sa.Integer(), nullable=False),
+        sa.Column('epoch_time_to_respawn', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['boss_name'], ['boss_respawns.boss_name']),
+        sa.PrimaryKeyConstraint('chat_id', 'boss_name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('chat_boss_respawns')
@@ -0,0 +1,33 @@
+"""chat settings
+
+Revision ID: f8c2d5a7e6b1
+Revises: e42b7c9d8f13
+Create Date: 2026-10-18 14:31:57.210466
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c2d5a7e6b1'
+down_revision: Union[str, None] = 'e42b7c9d8f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'chat_settings',
+        sa.Column('chat_id', sa.String(), nullable=False),
+        sa.Column('timezone', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('chat_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('chat_settings')
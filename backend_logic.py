@@ -1,18 +1,118 @@
 import asyncio
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from itertools import groupby, tee
 
-import pytz
-from tzlocal import get_localzone
-
+from config import (
+    TIMERS_RESTORE_BATCH,
+    MISSED_TIMER_POLICY,
+    MISSED_TIMER_WINDOW,
+    OUTBOUND_GLOBAL_RATE,
+    OUTBOUND_GLOBAL_BURST,
+    OUTBOUND_CHAT_RATE,
+    OUTBOUND_CHAT_BURST,
+    OUTBOUND_METRICS_INTERVAL,
+    REMINDER_COALESCE_WINDOW,
+    SCHEDULER_MAX_SLEEP,
+    SCHEDULER_DRIFT_BOUND,
+    SCHEDULER_METRICS_INTERVAL,
+    RESPAWN_PERIOD_PADDING,
+    BOSS_RESPAWNS_RELOAD_INTERVAL,
+    CHAT_TIMERS_CHECK_INTERVAL,
+    CHAT_TIMERS_CHECK_BATCH,
+    RESPONSE_CACHE_SIZE,
+    DEFAULT_TIMEZONE,
+    PARTICIPANTS_CHUNK_SIZE,
+    DATABASE_POOL_METRICS_INTERVAL,
+    EXPIRED_TIMERS_SWEEP_INTERVAL,
+    EXPIRED_TIMERS_SWEEP_BATCH,
+    EXPIRED_TIMERS_GRACE,
+)
 from database.db_logic import DataBaseAPI
-from intervals import respawn_intervals
-from utils.time_helper import user_to_system_tz, system_to_user_tz, seconds_to_hh_mm
+from database.models import Timer
+from utils.boss_index import boss_index
+from utils.time_helper import DisplayZone, get_zone, now_ts, to_timestamp, from_timestamp, seconds_to_hh_mm, next_occurrence
 from utils.logger import backend_logger
+from utils.coalescer import Coalescer
+from utils.outbound import OutboundQueue, PRIORITY_RESPAWN, PRIORITY_WARNING, PRIORITY_REPLY
+from utils.response_cache import ResponseCache
+from utils.scheduler import Scheduler, ScheduledJob
+
+MAX_RESPAWN_HOURS = 72
 
 db = DataBaseAPI()
-vietnam_tz = pytz.timezone("Asia/Ho_Chi_Minh")
-system_tz = vietnam_tz
+scheduler = Scheduler(
+    max_sleep=SCHEDULER_MAX_SLEEP,
+    drift_bound=SCHEDULER_DRIFT_BOUND,
+    metrics_interval=SCHEDULER_METRICS_INTERVAL,
+    group_window=REMINDER_COALESCE_WINDOW,
+)
+outbound = OutboundQueue(
+    global_rate=OUTBOUND_GLOBAL_RATE,
+    global_burst=OUTBOUND_GLOBAL_BURST,
+    chat_rate=OUTBOUND_CHAT_RATE,
+    chat_burst=OUTBOUND_CHAT_BURST,
+    metrics_interval=OUTBOUND_METRICS_INTERVAL,
+)
+# /bosses - по чату, версия: поколение boss_respawns; /get - по (чат, количество),
+# версия: версия набора таймеров чата, текущая минута и часовой пояс чата
+bosses_responses = ResponseCache(RESPONSE_CACHE_SIZE)
+timers_responses = ResponseCache(RESPONSE_CACHE_SIZE)
+default_zone = get_zone(DEFAULT_TIMEZONE) or get_zone("UTC+0")
+ingestions: dict[str, asyncio.Task] = {}
+MISSED_TIMER_POLICIES = ('late', 'skip', 'roll')
+
+
+@dataclass(eq=False)
+class TimerReminder:
+    timer_id: str
+    chat_id: str
+    boss_name: str
+    respawn_at: float
+    period: int | None
+    user_id: str | None = None
+    reply_to: int | None = None
+    warned: bool = False
+
+    @property
+    def is_new_epoch(self) -> bool:
+        return self.period is None
+
+    @classmethod
+    def from_timer(cls, timer: Timer, **kwargs) -> "TimerReminder":
+        return cls(
+            timer_id=timer.timer_id,
+            chat_id=timer.chat_id,
+            boss_name=timer.boss_name,
+            respawn_at=to_timestamp(timer.respawn_time),
+            period=timer.respawn_period,
+            **kwargs,
+        )
+
+
+REMINDER_TEXTS = {
+    'warning': (
+        "‼️ Boss **{}** sẽ hồi sinh trong 3 phút!",
+        "‼️ Các boss sẽ hồi sinh trong 3 phút:\n{}",
+        PRIORITY_WARNING,
+    ),
+    'epoch_warning': (
+        "‼️ Boss **{}** sẽ hồi sinh trong 3 phút, chuẩn bị nhé!",
+        "‼️ Các boss sẽ hồi sinh trong 3 phút, chuẩn bị nhé!\n{}",
+        PRIORITY_WARNING,
+    ),
+    'respawn': (
+        "✅ Boss **{}** đã hồi sinh!",
+        "✅ Các boss đã hồi sinh!\n{}",
+        PRIORITY_RESPAWN,
+    ),
+}
+
+
+def bind_client(client):
+    outbound.bind(client)
+    scheduler.start()
 
 
 async def init_db():
@@ -20,139 +120,422 @@ async def init_db():
     res2 = await db.initialize_boss_respawns()
     if not res1 or not res2:
         backend_logger.error(f"Lỗi: không thể khởi tạo cơ sở dữ liệu")
+        return
+    if not await db.reload_boss_respawns(force=True):
+        backend_logger.error(f"Lỗi: không thể tải thời gian hồi sinh boss")
+        return
+    boss_index.replace(db.intervals.names())
+    await restore_timers()
+    scheduler.schedule(
+        key='boss_respawns_reloader',
+        fire_at=time.time() + BOSS_RESPAWNS_RELOAD_INTERVAL,
+        callback=reload_boss_respawns,
+    )
+    scheduler.schedule(
+        key='chat_timers_cache_checker',
+        fire_at=time.time() + CHAT_TIMERS_CHECK_INTERVAL,
+        callback=check_chat_timers_cache,
+    )
+    scheduler.schedule(
+        key='database_metrics',
+        fire_at=time.time() + DATABASE_POOL_METRICS_INTERVAL,
+        callback=report_database_metrics,
+    )
+    scheduler.schedule(
+        key='expired_timers_sweeper',
+        fire_at=time.time() + EXPIRED_TIMERS_SWEEP_INTERVAL,
+        callback=sweep_expired_timers,
+    )
+
+
+async def reload_boss_respawns(job: ScheduledJob):
+    scheduler.reschedule(job, time.time() + BOSS_RESPAWNS_RELOAD_INTERVAL)
+    if await db.reload_boss_respawns():
+        boss_index.replace(db.intervals.names())
+        backend_logger.info(f"Đã cập nhật thời gian hồi sinh của {len(db.intervals)} boss")
+
+
+async def check_chat_timers_cache(job: ScheduledJob):
+    scheduler.reschedule(job, time.time() + CHAT_TIMERS_CHECK_INTERVAL)
+    await db.check_chat_timers_cache(CHAT_TIMERS_CHECK_BATCH)
+
+
+async def report_database_metrics(job: ScheduledJob):
+    scheduler.reschedule(job, time.time() + DATABASE_POOL_METRICS_INTERVAL)
+    db.log_metrics()
+
+
+async def sweep_expired_timers(job: ScheduledJob):
+    scheduler.reschedule(job, time.time() + EXPIRED_TIMERS_SWEEP_INTERVAL)
+    await db.delete_expired_timers(batch_size=EXPIRED_TIMERS_SWEEP_BATCH, grace=EXPIRED_TIMERS_GRACE)
+
+
+async def restore_timers():
+    now = now_ts()
+    restored = missed = 0
+    policy = MISSED_TIMER_POLICY
+    if policy not in MISSED_TIMER_POLICIES:
+        backend_logger.error(
+            f"Chính sách MISSED_TIMER_POLICY={policy!r} không hợp lệ, dùng 'roll' "
+            f"(hợp lệ: {', '.join(MISSED_TIMER_POLICIES)})"
+        )
+        policy = 'roll'
+
+    async for timers in db.stream_timers(TIMERS_RESTORE_BATCH):
+        expired = []
+        for timer in timers:
+            reminder = TimerReminder.from_timer(timer)
+            upcoming = next_occurrence(reminder.respawn_at, reminder.period, now)
+            if upcoming <= now:
+                previous = upcoming
+            elif reminder.period is not None and upcoming > reminder.respawn_at:
+                previous = upcoming - reminder.period
+            else:
+                previous = None
+
+            if previous is not None and now - previous <= MISSED_TIMER_WINDOW:
+                missed += 1
+                if policy == 'late':
+                    upcoming = previous
+                elif reminder.is_new_epoch:
+                    # У разового таймера следующего респавна нет
+                    expired.append(timer.timer_id)
+                    continue
+            elif upcoming <= now:
+                expired.append(timer.timer_id)
+                continue
+
+            reminder.respawn_at = upcoming
+            schedule_timer(reminder)
+            restored += 1
+
+        if expired:
+            await db.delete_timers(expired)
+
+    backend_logger.info(
+        f"Đã khôi phục {restored} hẹn giờ, bỏ lỡ {missed} (chính sách: {policy})"
+    )
+
+
+async def calculate_respawn_time(kill_at: float, now: float, chat_id, boss_name, is_new_epoch: bool = False):
+    if kill_at > now:
+        kill_at -= 24 * 3600
+
+    intervals = await db.get_chat_boss_respawn(chat_id, boss_name)
+    if not intervals:
+        return None, None
+    time_to_respawn, epoch_time_to_respawn = intervals
+    interval = (epoch_time_to_respawn if is_new_epoch else time_to_respawn) * 3600
+    return kill_at + interval, interval
+
+
+async def get_chat_zone(chat_id: str) -> DisplayZone:
+    timezone = await db.get_chat_timezone(chat_id)
+    return (get_zone(timezone) if timezone else None) or default_zone
+
+
+async def resolve_boss_name(chat_id: str, boss_name: str, user_id: str, event) -> str | None:
+    resolved_name, suggestions = boss_index.resolve(boss_name)
+    if resolved_name is None:
+        text = f"❌ Boss **{boss_name}** không tồn tại."
+        if suggestions:
+            text += "\nCó phải bạn muốn: " + ", ".join(f"`{name}`" for name in suggestions) + "?"
+        await outbound.reply(event, text)
+        backend_logger.error(f"Trong chat {chat_id} Người dùng {user_id} nhập sai tên boss.")
+    return resolved_name
 
 
-async def calculate_respawn_datetime(kill_datetime, now, boss_name, is_new_epoch: bool = False):
-    if kill_datetime > now:
-        kill_datetime -= timedelta(days=1)
+async def set_timer(chat_id: str, boss_name: str, kill_time_str: str | None, user_id: str, event, is_new_epoch: bool = False):
+    boss_name = await resolve_boss_name(chat_id, boss_name, user_id, event)
+    if boss_name is None:
+        return
 
-    interval_raw = respawn_intervals[boss_name][1] if is_new_epoch else respawn_intervals[boss_name][0]
-    interval = timedelta(hours=interval_raw)
-    respawn_datetime = kill_datetime + interval
-    return respawn_datetime, interval
+    zone = await get_chat_zone(chat_id)
+    now = now_ts()
+    if kill_time_str:
+        kill_time = datetime.strptime(kill_time_str, "%H:%M")
+        kill_at = zone.today_at(kill_time.hour, kill_time.minute, now)
+    else:
+        kill_at = now
+
+    respawn_at, interval = await calculate_respawn_time(kill_at, now, chat_id, boss_name, is_new_epoch)
+    if respawn_at is None:
+        await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
+        return
 
+    if respawn_at < now:
+        await outbound.reply(event, f"❌ Boss **{boss_name}** đã hồi sinh rồi, nhanh tay tiêu diệt đi!")
+        return
 
-async def set_timer(chat_id: str, boss_name: str, kill_time_str: str | None, user_id: str, event, is_new_epoch: bool = False):
-    if boss_name not in respawn_intervals:
-        await event.reply(f"❌ Boss **{boss_name}** không tồn tại.")
-        backend_logger.error(f"Trong chat {chat_id} Người dùng {user_id} nhập sai tên boss.")
+    respawn_period = None if is_new_epoch else interval + RESPAWN_PERIOD_PADDING
+    timer = await db.add_timer(
+        user_id=user_id,
+        chat_id=chat_id,
+        boss_name=boss_name,
+        respawn_time=from_timestamp(respawn_at),
+        respawn_period=respawn_period,
+        is_epoch=is_new_epoch,
+    )
+    if not timer:
+        await outbound.reply(event, "❌ Lỗi cơ sở dữ liệu khi lưu hẹn giờ")
         return
 
-    now = system_tz.localize(datetime.now())
-    kill_datetime = now if not kill_time_str else user_to_system_tz(datetime.combine(now.date(), datetime.strptime(kill_time_str, "%H:%M").time()))
+    reminder = TimerReminder.from_timer(timer, user_id=user_id, reply_to=event.id)
+    remaining_formatted_time = seconds_to_hh_mm(reminder.respawn_at - now)
 
-    respawn_datetime, interval = await calculate_respawn_datetime(kill_datetime, now, boss_name, is_new_epoch)
+    if not is_new_epoch:
+        await outbound.reply(event, f"✅ Đã đặt hẹn giờ:\n{zone.hh_mm(reminder.respawn_at)} — **{timer.boss_name}** ({remaining_formatted_time}) — `{timer.timer_id}`")
 
-    if respawn_datetime < now:
-        await event.reply(f"❌ Boss **{boss_name}** đã hồi sinh rồi, nhanh tay tiêu diệt đi!")
-        return
+    schedule_timer(reminder)
 
-    timer = await db.add_timer(user_id=user_id, chat_id=chat_id, boss_name=boss_name, respawn_time=respawn_datetime)
-    if not timer:
-        await event.reply("❌ Lỗi cơ sở dữ liệu khi lưu hẹn giờ")
-        return
-
-    remaining_time = respawn_datetime - now
-    wait_seconds = remaining_time.total_seconds()
-    time_to_notification = wait_seconds - 180
-    remaining_formatted_time = seconds_to_hh_mm(wait_seconds)
-
-    if is_new_epoch:
-        await asyncio.sleep(time_to_notification)
-        if not await db._get_timer(timer): return
-        await event.reply(f"‼️ Boss **{boss_name}** sẽ hồi sinh trong 3 phút, chuẩn bị nhé!")
-        await asyncio.sleep(180)
-        if not await db._get_timer(timer): return
-        await event.reply(f"✅ Boss **{boss_name}** đã hồi sinh!")
-        await db.delete_timer(user_id=user_id, timer_id=timer.timer_id)
-        return
-
-    while True:
-        await event.reply(f"✅ Đã đặt hẹn giờ:\n{system_to_user_tz(timer.respawn_time)} — **{timer.boss_name}** ({remaining_formatted_time}) — `{timer.timer_id}`")
-        if time_to_notification > 0:
-            await asyncio.sleep(time_to_notification)
-            if not await db._get_timer(timer): return
-            await event.reply(f"‼️ Boss **{boss_name}** sẽ hồi sinh trong 3 phút!")
-            await asyncio.sleep(180)
+
+def schedule_timer(reminder: TimerReminder):
+    respawn_at = reminder.respawn_at
+    time_to_notification = respawn_at - time.time() - 180
+    reminder.warned = time_to_notification <= 0 and (not reminder.is_new_epoch or respawn_at <= time.time())
+    fire_at = respawn_at if reminder.warned else respawn_at - 180
+    scheduler.schedule(
+        key=reminder.timer_id,
+        fire_at=fire_at,
+        callback=fire_timer,
+        group=reminder.chat_id,
+        payload=reminder,
+    )
+
+
+async def send_reminder(reminder: TimerReminder, text: str, priority: int = PRIORITY_REPLY):
+    await outbound.send(reminder.chat_id, text, reply_to=reminder.reply_to, priority=priority)
+
+
+# Напоминания чата, сработавшие в одном проходе планировщика (он подтягивает
+# напоминания чата в пределах REMINDER_COALESCE_WINDOW), уходят вместе.
+# deadline - когда напоминание должно было уйти, по нему считается drift
+async def notify(reminder: TimerReminder, kind: str, job: ScheduledJob, deadline: float):
+    await coalescer.add(reminder.chat_id, (kind, reminder, deadline), expected=job.batch)
+
+
+async def flush_reminders(chat_id: str, items: list[tuple[str, TimerReminder, float]]):
+    by_kind: dict[str, list[tuple[TimerReminder, float]]] = {}
+    for kind, reminder, deadline in items:
+        by_kind.setdefault(kind, []).append((reminder, deadline))
+
+    for kind, entries in by_kind.items():
+        single_text, batch_text, priority = REMINDER_TEXTS[kind]
+        if len(entries) == 1:
+            text = single_text.format(entries[0][0].boss_name)
         else:
-            await asyncio.sleep(wait_seconds)
-        if not await db._get_timer(timer): return
-        await event.reply(f"✅ Boss **{boss_name}** đã hồi sinh!")
-        respawn_datetime += interval + timedelta(seconds=60)
-        timer = await db.update_timer(timer, respawn_datetime)
-        if not timer:
-            await event.reply("❌ Lỗi cập nhật hẹn giờ")
-            return
-        wait_seconds = interval.total_seconds()
-        time_to_notification = wait_seconds - 180
-        remaining_formatted_time = seconds_to_hh_mm(wait_seconds)
+            text = batch_text.format("\n".join(f"— **{reminder.boss_name}**" for reminder, _ in entries))
+        await send_reminder(entries[0][0], text, priority)
+        delivered_at = time.time()
+        for _, deadline in entries:
+            scheduler.metrics.observe(delivered_at - deadline)
+
+
+coalescer = Coalescer(REMINDER_COALESCE_WINDOW, flush_reminders)
+
+
+async def fire_timer(job: ScheduledJob):
+    reminder: TimerReminder = job.payload
+    # Подтянутое раньше срока напоминание отсчитывается от начала прохода
+    deadline = min(job.fire_at, time.time())
+    if not await db.is_timer_alive(reminder.timer_id, reminder.chat_id, reminder.boss_name):
+        if job.batch > 1:
+            coalescer.skip(reminder.chat_id, expected=job.batch)
+        return
+
+    if not reminder.warned:
+        reminder.warned = True
+        scheduler.reschedule(job, reminder.respawn_at)
+        await notify(reminder, 'epoch_warning' if reminder.is_new_epoch else 'warning', job, deadline)
+        return
+
+    if reminder.is_new_epoch:
+        await notify(reminder, 'respawn', job, deadline)
+        await db.delete_timer(user_id=reminder.user_id, timer_id=reminder.timer_id)
+        return
+
+    # Следующий респавн вычисляется от якоря, в БД ничего не пишем
+    now = now_ts()
+    reminder.respawn_at = next_occurrence(reminder.respawn_at + reminder.period, reminder.period, now)
+    schedule_timer(reminder)
+    await notify(reminder, 'respawn', job, deadline)
+
+    zone = await get_chat_zone(reminder.chat_id)
+    remaining_formatted_time = seconds_to_hh_mm(reminder.respawn_at - now)
+    await send_reminder(reminder, f"✅ Đã đặt hẹn giờ:\n{zone.hh_mm(reminder.respawn_at)} — **{reminder.boss_name}** ({remaining_formatted_time}) — `{reminder.timer_id}`")
 
 
 async def get_bosses(chat_id: str, user_id: str, event):
-    text_strings = ["Danh sách tất cả boss:\n"]
-    for boss in respawn_intervals:
-        text_strings.append(f"`{boss:<20}` | {respawn_intervals[boss][0]} giờ")
-    await event.reply("\n".join(text_strings))
+    text = bosses_responses.get(chat_id, db.intervals.generation)
+    if text is None:
+        text_strings = ["Danh sách tất cả boss:\n"]
+        for boss in await db.get_all_boss_respawns(user_id=user_id) or ():
+            intervals = await db.get_chat_boss_respawn(chat_id, boss.boss_name)
+            time_to_respawn = intervals[0] if intervals else boss.time_to_respawn
+            text_strings.append(f"`{boss.boss_name:<20}` | {time_to_respawn} giờ")
+        text = "\n".join(text_strings)
+        bosses_responses.set(chat_id, db.intervals.generation, text)
+    await outbound.reply(event, text)
+
+
+async def set_chat_interval(chat_id: str, boss_name: str, hours: int | None, epoch_hours: int | None, user_id: str, event):
+    boss_name = await resolve_boss_name(chat_id, boss_name, user_id, event)
+    if boss_name is None:
+        return
+
+    if hours is None:
+        if not await db.delete_chat_boss_respawn(user_id, chat_id, boss_name):
+            await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
+            return
+        bosses_responses.pop(chat_id)
+        await outbound.reply(event, f"✅ Đã khôi phục thời gian hồi sinh mặc định của **{boss_name}**")
+        return
+
+    if epoch_hours is None:
+        # Берём текущее значение чата, а не только глобальное из boss_respawns
+        intervals = await db.get_chat_boss_respawn(chat_id, boss_name)
+        if not intervals:
+            await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
+            return
+        epoch_hours = intervals[1]
+    if not (0 < hours <= MAX_RESPAWN_HOURS and 0 < epoch_hours <= MAX_RESPAWN_HOURS):
+        await outbound.reply(event, f"❌ Thời gian hồi sinh phải từ 1 đến {MAX_RESPAWN_HOURS} giờ")
+        return
+
+    if not await db.set_chat_boss_respawn(user_id, chat_id, boss_name, hours, epoch_hours):
+        await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
+        return
+    bosses_responses.pop(chat_id)
+    await outbound.reply(
+        event,
+        f"✅ Thời gian hồi sinh của **{boss_name}** trong nhóm: {hours} giờ (kỷ nguyên mới: {epoch_hours} giờ)",
+    )
+
+
+async def set_chat_timezone(chat_id: str, timezone: str | None, user_id: str, event):
+    if timezone is None:
+        zone = await get_chat_zone(chat_id)
+        await outbound.reply(event, f"🕒 Múi giờ của nhóm: `{zone.name}`, bây giờ là {zone.hh_mm(now_ts())}")
+        return
+
+    zone = get_zone(timezone)
+    if zone is None:
+        await outbound.reply(event, "❌ Múi giờ không hợp lệ. Ví dụ: `Asia/Ho_Chi_Minh` hoặc `UTC+7`")
+        return
+
+    if not await db.set_chat_timezone(user_id, chat_id, zone.name):
+        await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
+        return
+    await outbound.reply(event, f"✅ Đã đặt múi giờ của nhóm: `{zone.name}`, bây giờ là {zone.hh_mm(now_ts())}")
 
 
 async def delete_timer(user_id: str, chat_id: str, timer_id: str, event):
     res = await db.delete_timer(user_id, timer_id)
     if res == 'alien':
-        await event.reply("❌ Không thể xóa hẹn giờ của người khác")
+        await outbound.reply(event, "❌ Không thể xóa hẹn giờ của người khác")
         return
     if not res:
-        await event.reply("❌ Lỗi truy cập cơ sở dữ liệu")
+        await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
         return
-    await event.reply(f"✅ Đã xóa hẹn giờ ID {timer_id}")
+    scheduler.cancel(timer_id)
+    await outbound.reply(event, f"✅ Đã xóa hẹn giờ ID {timer_id}")
 
 
 async def delete_all_timers(chat_id: str, user_id: str, event):
     res = await db.delete_all_timers_in_chat(chat_id)
     if res == 'no_timers':
-        await event.reply("❌ Không có hẹn giờ nào để xóa")
+        await outbound.reply(event, "❌ Không có hẹn giờ nào để xóa")
         return
     if not res:
-        await event.reply("❌ Lỗi cơ sở dữ liệu khi xóa tất cả")
+        await outbound.reply(event, "❌ Lỗi cơ sở dữ liệu khi xóa tất cả")
         return
-    await event.reply("✅ Đã xóa tất cả hẹn giờ")
+    scheduler.cancel_group(chat_id)
+    await outbound.reply(event, "✅ Đã xóa tất cả hẹn giờ")
 
 
 async def get_chat_timers(chat_id: str, timer_numbers: int, user_id: str, event):
-    user_info = await db.get_userinfo(user_id)
-    nickname, firstname = user_info
-    timers = await db.get_all_chat_timers(user_id, chat_id) if timer_numbers < 1 else await db.get_chat_timers(user_id, chat_id, timer_numbers)
+    zone = await get_chat_zone(chat_id)
+    now = now_ts()
+    minute = int(now // 60)
+    version = db.chat_timers.version(chat_id)
+    text = timers_responses.get((chat_id, timer_numbers), (version, minute, zone.name)) if version is not None else None
+    if text is not None:
+        await outbound.reply(event, text)
+        return
+
+    timers = await db.get_chat_timers(user_id, chat_id, timer_numbers, now)
 
     if timers is False:
-        await event.reply("❌ Lỗi truy cập cơ sở dữ liệu")
+        await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
         return
     if not timers:
-        await event.reply("Hiện tại không có hẹn giờ nào")
-        return
+        text = "Hiện tại không có hẹn giờ nào"
+    else:
+        text_strings = ["**Boss sắp xuất hiện:**\n"]
+        for timer in timers:
+            remaining_formatted_time = seconds_to_hh_mm(timer.respawn_at - now)
+            text_strings.append(f"{zone.hh_mm(timer.respawn_at)} — **{timer.boss_name}** ({remaining_formatted_time}) — `{timer.timer_id}`")
+        text = "\n".join(text_strings)
 
-    now = system_tz.localize(datetime.now())
-    text_strings = ["**Boss sắp xuất hiện:**\n"]
-    for timer in timers:
-        remaining_time = (timer.respawn_time - now).total_seconds()
-        remaining_formatted_time = seconds_to_hh_mm(remaining_time)
-        text_strings.append(f"{system_to_user_tz(timer.respawn_time)} — **{timer.boss_name}** ({remaining_formatted_time}) — `{timer.timer_id}`")
-    await event.reply("\n".join(text_strings))
+    # Между чтением таймеров и этой строкой нет await, версия соответствует тексту
+    version = db.chat_timers.version(chat_id)
+    if version is not None:
+        timers_responses.set((chat_id, timer_numbers), (version, minute, zone.name), text)
+    await outbound.reply(event, text)
 
 
 async def epochs_timers_start(chat_id: str, user_id: str, event):
     bosses = await db.get_all_boss_respawns(user_id=user_id)
     if bosses is False:
-        await event.reply("❌ Lỗi truy cập cơ sở dữ liệu")
+        await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
         return
 
-    tasks = [asyncio.create_task(set_timer(chat_id=chat_id, boss_name=boss.boss_name, kill_time_str=None, user_id=user_id, event=event, is_new_epoch=True)) for boss in bosses]
-
-    await event.reply("✅ Đã đặt hẹn giờ cho tất cả boss. Sử dụng /get để xem thông tin.")
-    await asyncio.gather(*tasks)
-
+    now = now_ts()
+    respawn_times = {}
+    for boss in bosses:
+        respawn_at, _ = await calculate_respawn_time(now, now, chat_id, boss.boss_name, is_new_epoch=True)
+        if respawn_at is None:
+            await outbound.reply(event, "❌ Lỗi truy cập cơ sở dữ liệu")
+            return
+        respawn_times[boss.boss_name] = from_timestamp(respawn_at)
 
-async def start_chat(chat_id: str, chat, participants, event):
-    for p in participants:
-        user_id, nickname, firstname = str(p.id), p.username, p.first_name
-        await db.add_userinfo(user_id, nickname, firstname)
+    timers = await db.add_timers(user_id=user_id, chat_id=chat_id, respawn_times=respawn_times, is_epoch=True)
+    if not timers:
+        await outbound.reply(event, "❌ Lỗi cơ sở dữ liệu khi lưu hẹn giờ")
+        return
 
-    await event.reply("Xin chào! Tôi sẽ giúp bạn không bỏ lỡ thời gian xuất hiện của boss. Dùng /help để xem các lệnh hỗ trợ.")
+    for timer in timers:
+        schedule_timer(TimerReminder.from_timer(timer, user_id=user_id, reply_to=event.id))
+
+    await outbound.reply(event, "✅ Đã đặt hẹn giờ cho tất cả boss. Sử dụng /get để xem thông tin.")
+
+
+async def start_chat(chat_id: str, chat, client, event):
+    task = ingestions.get(chat_id)
+    if task is None or task.done():
+        task = ingestions[chat_id] = asyncio.create_task(ingest_participants(chat_id, chat, client))
+        task.add_done_callback(lambda _: ingestions.pop(chat_id, None))
+
+    await outbound.reply(event, "Xin chào! Tôi sẽ giúp bạn không bỏ lỡ thời gian xuất hiện của boss. Dùng /help để xem các lệnh hỗ trợ.")
+
+
+# Участники читаются потоком и пишутся пачками по PARTICIPANTS_CHUNK_SIZE
+# одним INSERT ... ON CONFLICT DO NOTHING
+async def ingest_participants(chat_id: str, chat, client):
+    chunk, seen, added = [], 0, 0
+    try:
+        async for p in client.iter_participants(chat):
+            chunk.append(dict(user_id=str(p.id), user_nickname=p.username or '', user_firstname=p.first_name or ''))
+            if len(chunk) < PARTICIPANTS_CHUNK_SIZE:
+                continue
+            seen += len(chunk)
+            added += await db.add_userinfos(chunk) or 0
+            chunk = []
+            backend_logger.info(f"Chat {chat_id}: đã xử lý {seen} thành viên, thêm mới {added}")
+        if chunk:
+            seen += len(chunk)
+            added += await db.add_userinfos(chunk) or 0
+    except Exception as e:
+        backend_logger.error(f"Lỗi khi tải danh sách thành viên chat {chat_id}: {e}")
+        return
+    backend_logger.success(f"Chat {chat_id}: đã tải xong {seen} thành viên, thêm mới {added}")
@@ -10,3 +10,72 @@ BOT_TOKEN = str(os.getenv('BOT_TOKEN'))
 SESSIONS_DIRECTORY = os.getenv('SESSIONS_DIRECTORY')
 DATABASE_URL = os.getenv('DATABASE_URL')
 DATABASE_ECHO = bool(os.getenv('DATABASE_ECHO'))
+DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv('DATABASE_MAX_OVERFLOW', 10))
+DATABASE_POOL_TIMEOUT = float(os.getenv('DATABASE_POOL_TIMEOUT', 30))
+DATABASE_POOL_RECYCLE = int(os.getenv('DATABASE_POOL_RECYCLE', 1800))
+DATABASE_POOL_PRE_PING = os.getenv('DATABASE_POOL_PRE_PING', '0') not in ('0', 'false', 'False', '')
+# Кэши asyncpg: statement_cache_size - самого asyncpg, prepared_statement_cache_size -
+# адаптера SQLAlchemy. За pgbouncer в режиме transaction оба нужно выставить в 0
+DATABASE_STATEMENT_CACHE_SIZE = int(os.getenv('DATABASE_STATEMENT_CACHE_SIZE', 100))
+DATABASE_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv('DATABASE_PREPARED_STATEMENT_CACHE_SIZE', 100))
+DATABASE_POOL_METRICS_INTERVAL = float(os.getenv('DATABASE_POOL_METRICS_INTERVAL', 60))
+# Только для sqlite+aiosqlite. NORMAL в режиме WAL не теряет целостность,
+# но последние транзакции могут пропасть при отключении питания
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)) # мс
+# Сколько секунд копить изменения таймеров перед общей транзакцией, 0 - писать сразу
+TIMER_WRITE_BATCH_DELAY = float(os.getenv('TIMER_WRITE_BATCH_DELAY', 0))
+TIMER_WRITE_BATCH_SIZE = int(os.getenv('TIMER_WRITE_BATCH_SIZE', 500))
+
+TIMERS_RESTORE_BATCH = int(os.getenv('TIMERS_RESTORE_BATCH', 1000))
+# late - отправить пропущенное напоминание сразу, skip - не отправлять его,
+# roll - молча перенести таймер на следующий цикл респавна. При skip и roll
+# разовый таймер удаляется, циклический продолжает работать со следующего цикла
+MISSED_TIMER_POLICY = os.getenv('MISSED_TIMER_POLICY', 'roll')
+# У циклических таймеров хранится только якорь, поэтому пропущенными считаются
+# респавны, случившиеся не раньше чем за столько секунд до запуска
+MISSED_TIMER_WINDOW = float(os.getenv('MISSED_TIMER_WINDOW', 900))
+
+OUTBOUND_GLOBAL_RATE = float(os.getenv('OUTBOUND_GLOBAL_RATE', 25))
+OUTBOUND_GLOBAL_BURST = float(os.getenv('OUTBOUND_GLOBAL_BURST', 30))
+OUTBOUND_CHAT_RATE = float(os.getenv('OUTBOUND_CHAT_RATE', 20 / 60))
+OUTBOUND_CHAT_BURST = float(os.getenv('OUTBOUND_CHAT_BURST', 5))
+OUTBOUND_METRICS_INTERVAL = float(os.getenv('OUTBOUND_METRICS_INTERVAL', 60))
+
+# Монотонный сон планировщика ограничен, чтобы замечать скачки настенных часов
+SCHEDULER_MAX_SLEEP = float(os.getenv('SCHEDULER_MAX_SLEEP', 1))
+SCHEDULER_DRIFT_BOUND = float(os.getenv('SCHEDULER_DRIFT_BOUND', 1))
+SCHEDULER_METRICS_INTERVAL = float(os.getenv('SCHEDULER_METRICS_INTERVAL', 60))
+# Запас, добавляемый к интервалу босса в каждом цикле циклического таймера
+RESPAWN_PERIOD_PADDING = int(os.getenv('RESPAWN_PERIOD_PADDING', 60))
+
+# Напоминания чата, срок которых наступает в пределах окна от первого сработавшего,
+# уходят одним сообщением; столько же ждём отстающие напоминания из этого прохода
+REMINDER_COALESCE_WINDOW = float(os.getenv('REMINDER_COALESCE_WINDOW', 2))
+
+BOSS_RESPAWNS_RELOAD_INTERVAL = float(os.getenv('BOSS_RESPAWNS_RELOAD_INTERVAL', 60))
+CHAT_INTERVALS_CACHE_SIZE = int(os.getenv('CHAT_INTERVALS_CACHE_SIZE', 50000))
+
+CHAT_TIMERS_CACHE_SIZE = int(os.getenv('CHAT_TIMERS_CACHE_SIZE', 1000))
+CHAT_TIMERS_CHECK_INTERVAL = float(os.getenv('CHAT_TIMERS_CHECK_INTERVAL', 300))
+CHAT_TIMERS_CHECK_BATCH = int(os.getenv('CHAT_TIMERS_CHECK_BATCH', 20))
+
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 5000))
+
+PARTICIPANTS_CHUNK_SIZE = int(os.getenv('PARTICIPANTS_CHUNK_SIZE', 500))
+
+DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'Asia/Ho_Chi_Minh')
+CHAT_SETTINGS_CACHE_SIZE = int(os.getenv('CHAT_SETTINGS_CACHE_SIZE', 10000))
+
+EXPIRED_TIMERS_SWEEP_INTERVAL = float(os.getenv('EXPIRED_TIMERS_SWEEP_INTERVAL', 60))
+EXPIRED_TIMERS_SWEEP_BATCH = int(os.getenv('EXPIRED_TIMERS_SWEEP_BATCH', 500))
+EXPIRED_TIMERS_GRACE = float(os.getenv('EXPIRED_TIMERS_GRACE', 300))
+
+LOG_ENQUEUE = os.getenv('LOG_ENQUEUE', '1') not in ('0', 'false', 'False', '')
+LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', 100))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 1))
+LOG_ROTATION_BYTES = int(os.getenv('LOG_ROTATION_BYTES', 100 * 1024 * 1024))
+LOG_SAMPLE_THRESHOLD = int(os.getenv('LOG_SAMPLE_THRESHOLD', 50))
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', 10))
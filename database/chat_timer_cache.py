@@ -0,0 +1,146 @@
+import heapq
+import itertools
+from collections import OrderedDict
+from typing import Iterable, NamedTuple
+
+from database.models import TimerRow
+from utils.time_helper import next_occurrence
+
+
+class CachedTimer(NamedTuple):
+    timer_id: str
+    boss_name: str
+    respawn_at: float
+    respawn_period: int | None
+
+
+def upcoming(timers: Iterable[CachedTimer], count: int, now: float) -> list[TimerRow]:
+    rows = (
+        TimerRow(timer.timer_id, timer.boss_name, next_occurrence(timer.respawn_at, timer.respawn_period, now))
+        for timer in timers
+    )
+    rows = [row for row in rows if row.respawn_at >= now]
+    if count > 0:
+        return heapq.nsmallest(count, rows, key=lambda row: row.respawn_at)
+    return sorted(rows, key=lambda row: row.respawn_at)
+
+
+class ChatTimers:
+    def __init__(self, timers: Iterable[CachedTimer], version: int):
+        self.timers: dict[str, CachedTimer] = {timer.timer_id: timer for timer in timers}
+        self.version = version
+
+
+# Таймеры чатов в памяти для /get (все строки чата, включая истёкшие разовые
+# до их удаления чистильщиком). Хранится не больше max_chats чатов, дольше
+# всех не читавшиеся вытесняются. Если чат изменился, пока его таймеры
+# читались из БД, прочитанное не кэшируется
+class ChatTimerCache:
+    def __init__(self, max_chats: int):
+        self._chats: OrderedDict[str, ChatTimers] = OrderedDict()
+        self._owners: dict[str, str] = {}
+        self._loading: dict[str, bool] = {}
+        self._max_chats = max_chats
+        self._versions = itertools.count(1)
+        self._check_cursor = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def __contains__(self, chat_id: str) -> bool:
+        return chat_id in self._chats
+
+    def version(self, chat_id: str) -> int | None:
+        chat = self._chats.get(chat_id)
+        return chat.version if chat is not None else None
+
+    def get(self, chat_id: str, count: int, now: float) -> list[TimerRow] | None:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            self.misses += 1
+            return None
+        self._chats.move_to_end(chat_id)
+        self.hits += 1
+        return upcoming(chat.timers.values(), count, now)
+
+    def begin_load(self, chat_id: str):
+        self._loading[chat_id] = False
+
+    def abort_load(self, chat_id: str):
+        self._loading.pop(chat_id, None)
+
+    def finish_load(self, chat_id: str, timers: Iterable[CachedTimer]) -> bool:
+        if self._loading.pop(chat_id, True):
+            return False
+        self._install(chat_id, timers)
+        return True
+
+    # Сверка с БД: None - чат изменился во время чтения или уже вытеснен,
+    # True - совпало, False - кэш был устаревшим и заменён прочитанным
+    def finish_check(self, chat_id: str, timers: list[CachedTimer]) -> bool | None:
+        chat = self._chats.get(chat_id)
+        if self._loading.pop(chat_id, True) or chat is None:
+            return None
+        if set(chat.timers.values()) == set(timers):
+            return True
+        for timer_id in chat.timers:
+            self._owners.pop(timer_id, None)
+        chat.timers = {timer.timer_id: timer for timer in timers}
+        chat.version = next(self._versions)
+        for timer_id in chat.timers:
+            self._owners[timer_id] = chat_id
+        return False
+
+    def put(self, chat_id: str, timer: CachedTimer):
+        self._touch_loading(chat_id)
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            return
+        for cached in list(chat.timers.values()):
+            if cached.boss_name == timer.boss_name and cached.timer_id != timer.timer_id:
+                del chat.timers[cached.timer_id]
+                self._owners.pop(cached.timer_id, None)
+        chat.timers[timer.timer_id] = timer
+        chat.version = next(self._versions)
+        self._owners[timer.timer_id] = chat_id
+
+    def remove(self, timer_id: str, chat_id: str | None = None):
+        chat_id = self._owners.pop(timer_id, None) or chat_id
+        if chat_id is None:
+            return
+        self._touch_loading(chat_id)
+        chat = self._chats.get(chat_id)
+        if chat is not None and chat.timers.pop(timer_id, None) is not None:
+            chat.version = next(self._versions)
+
+    def clear_chat(self, chat_id: str):
+        self._touch_loading(chat_id)
+        self._install(chat_id, ())
+
+    def next_to_check(self, count: int) -> list[str]:
+        chat_ids = list(self._chats)
+        if not chat_ids:
+            return []
+        start = self._check_cursor % len(chat_ids)
+        self._check_cursor = start + count
+        return (chat_ids[start:] + chat_ids[:start])[:count]
+
+    def _touch_loading(self, chat_id: str):
+        if chat_id in self._loading:
+            self._loading[chat_id] = True
+
+    def _install(self, chat_id: str, timers: Iterable[CachedTimer]):
+        self._drop(chat_id)
+        chat = self._chats[chat_id] = ChatTimers(timers, next(self._versions))
+        for timer_id in chat.timers:
+            self._owners[timer_id] = chat_id
+        while len(self._chats) > self._max_chats:
+            self._drop(next(iter(self._chats)))
+
+    def _drop(self, chat_id: str):
+        chat = self._chats.pop(chat_id, None)
+        if chat is not None:
+            for timer_id in chat.timers:
+                self._owners.pop(timer_id, None)
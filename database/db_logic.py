@@ -1,29 +1,135 @@
+import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select
-from sqlalchemy.sql import func
-
-from config import DATABASE_URL, DATABASE_ECHO
+from sqlalchemy import func, select, delete, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from config import (
+    DATABASE_URL,
+    CHAT_INTERVALS_CACHE_SIZE,
+    CHAT_TIMERS_CACHE_SIZE,
+    CHAT_SETTINGS_CACHE_SIZE,
+    TIMER_WRITE_BATCH_DELAY,
+    TIMER_WRITE_BATCH_SIZE,
+)
 from intervals import respawn_intervals
-from database.models import Base, Timer, BossRespawn, User
+from database.models import Base, Timer, TimerRow, BossRespawn, ChatBossRespawn, ChatSettings, User
+from database.chat_timer_cache import CachedTimer, ChatTimerCache, upcoming
+from database.interval_cache import IntervalCache
+from database.pool import InstrumentedPool, create_engines
+from database.timer_registry import TimerRegistry
+from database.write_batcher import WriteBatcher, WriteMetrics
 from utils.logger import database_logger
+from utils.lru_cache import LRUCache
+from utils.time_helper import now_ts, to_timestamp, from_timestamp
+
+_missing = object()
+
+
+# Горячие запросы по timers; на их планы есть тест в tests/test_query_plans.py
+def chat_timers_query(chat_id):
+    return (
+        select(Timer.timer_id, Timer.boss_name, Timer.respawn_time, Timer.respawn_period)
+        .filter(Timer.chat_id == chat_id)
+    )
+
+
+def expired_timers_query(now: datetime, batch_size: int):
+    return (
+        select(Timer.timer_id)
+        .filter(Timer.respawn_period.is_(None), Timer.respawn_time < now)
+        .limit(batch_size)
+    )
 
 
 class DataBaseAPI():
     def __init__(self):
-        self.engine = create_async_engine(DATABASE_URL, echo=DATABASE_ECHO, future=True)
+        self.engine, self.write_engine = create_engines(DATABASE_URL)
 
         self.async_session = sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
             expire_on_commit=False
         )
+        # Всё, что пишет в БД, открывает сессии отсюда
+        self.write_session = sessionmaker(
+            bind=self.write_engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+        self.timers = TimerRegistry()
+        self.intervals = IntervalCache()
+        # (chat_id, boss_name) -> (time_to_respawn, epoch_time_to_respawn) с учётом переопределений чата
+        self.chat_intervals = LRUCache(CHAT_INTERVALS_CACHE_SIZE)
+        self.chat_timers = ChatTimerCache(CHAT_TIMERS_CACHE_SIZE)
+        self.chat_timezones = LRUCache(CHAT_SETTINGS_CACHE_SIZE)
+        # Изменения таймеров (add_timer, update_timer, delete_timer)
+        self.write_metrics = WriteMetrics()
+        self.write_batcher = None
+        if TIMER_WRITE_BATCH_DELAY > 0:
+            self.write_batcher = WriteBatcher(
+                self.write_session, TIMER_WRITE_BATCH_DELAY, TIMER_WRITE_BATCH_SIZE, self.write_metrics
+            )
+
+    def log_metrics(self):
+        pools = {"Pool": self.engine.pool}
+        if self.write_engine is not self.engine:
+            pools["Writer pool"] = self.write_engine.pool
+        for title, pool in pools.items():
+            if not isinstance(pool, InstrumentedPool) or not pool.metrics.acquired:
+                continue
+            stats = pool.metrics.snapshot()
+            database_logger.info(
+                f"{title}: {stats['acquired']} checkouts, {stats['failed']} failed, "
+                f"wait p50 {stats['p50_wait'] * 1000:.1f}ms p99 {stats['p99_wait'] * 1000:.1f}ms "
+                f"max {stats['max_wait'] * 1000:.1f}ms, checked out {pool.checkedout()}/{pool.size()} "
+                f"(peak {stats['max_checked_out']}), overflow peak {stats['max_overflow']}"
+            )
+            pool.metrics.reset()
+
+        stats = self.write_metrics.snapshot()
+        if stats['operations']:
+            database_logger.info(
+                f"Timer writes: {stats['operations']} operations, {stats['failed']} failed, "
+                f"{stats['commits']} commits ({stats['commits_per_second']:.2f}/s), "
+                f"latency p50 {stats['p50_latency'] * 1000:.1f}ms p99 {stats['p99_latency'] * 1000:.1f}ms"
+            )
+        self.write_metrics.reset()
+
+
+    # after_commit обновляет кэши в памяти сразу после commit, без await между
+    # ними, поэтому кэши меняются в том же порядке, что и строки в БД
+    async def _write(self, operation, after_commit=None):
+        started = time.perf_counter()
+        failed = True
+        try:
+            if self.write_batcher is not None:
+                result = await self.write_batcher.submit(operation, after_commit)
+            else:
+                async with self.write_session() as session:
+                    async with session.begin():
+                        result = await operation(session)
+                    if after_commit is not None:
+                        after_commit(result)
+                self.write_metrics.commits += 1
+            failed = False
+            return result
+        finally:
+            self.write_metrics.observe(time.perf_counter() - started, failed)
+
+
+    # Записи в обход пачки сначала дожидаются накопленных изменений, чтобы не обогнать их
+    async def _flush_writes(self):
+        if self.write_batcher is not None:
+            await self.write_batcher.flush()
+
 
     async def create_tables(self) -> bool:
-        async with self.engine.begin() as conn: # Работает напрямую с соединением, а не с сессией, так как не ORM
+        async with self.write_engine.begin() as conn: # Работает напрямую с соединением, а не с сессией, так как не ORM
             try:
                 await conn.run_sync(Base.metadata.create_all)
                 database_logger.success("All metadata was created")
@@ -35,7 +141,7 @@ class DataBaseAPI():
 
 
     async def initialize_boss_respawns(self) -> bool:
-        async with self.async_session() as session:
+        async with self.write_session() as session:
             try:
                 result = await session.execute(select(BossRespawn))
                 bosses = result.scalars().all()
@@ -60,190 +166,388 @@ class DataBaseAPI():
                 return False
 
 
-    async def get_boss_respawn(self, user_id, boss_name) -> int:
+    async def reload_boss_respawns(self, force: bool = False) -> bool:
         async with self.async_session() as session:
             try:
                 result = await session.execute(
-                    select(BossRespawn.time_to_respawn)
-                    .filter(BossRespawn.boss_name == boss_name)
+                    select(
+                        func.max(BossRespawn.updated_at),
+                        func.count(),
+                        func.sum(BossRespawn.time_to_respawn),
+                        func.sum(BossRespawn.epoch_time_to_respawn),
+                    ).select_from(BossRespawn)
                 )
-                database_logger.success(f"User {user_id} got boss respawn info")
-                return result.scalar_one_or_none()
+                version = tuple(result.one())
+                if not force and version == self.intervals.version:
+                    return False
+
+                result = await session.execute(select(BossRespawn))
+                self.intervals.replace(result.scalars().all(), version)
+                self.chat_intervals.clear()
+                database_logger.success(f"Boss respawns cache reloaded: {len(self.intervals)} bosses")
+                return True
             except Exception as e:
-                database_logger.error(
-                    f"Error while getting boss respawn by user {user_id}: {str(e)}"
-                )
+                database_logger.error(f"Error while reloading boss respawns: {str(e)}")
                 return False
+
+
+    async def get_boss_respawn(self, user_id, boss_name) -> int:
+        if not self.intervals.loaded and not await self.reload_boss_respawns():
+            return False
+        intervals = self.intervals.get(boss_name)
+        return intervals[0] if intervals else None
                 
 
     async def get_all_boss_respawns(self, user_id) -> list[BossRespawn]:
+        if not self.intervals.loaded and not await self.reload_boss_respawns():
+            return False
+        return self.intervals.bosses()
+
+
+
+    async def get_chat_boss_respawn(self, chat_id, boss_name) -> tuple[int, int] | None:
+        key = (chat_id, boss_name)
+        intervals = self.chat_intervals.get(key, _missing)
+        if intervals is not _missing:
+            return intervals
+
         async with self.async_session() as session:
             try:
-                result = await session.execute(select(BossRespawn))
-                database_logger.success(f"User {user_id} got boss_respawns info")
+                result = await session.execute(
+                    select(ChatBossRespawn).filter(ChatBossRespawn.chat_id == chat_id)
+                )
+                overrides = {
+                    row.boss_name: (row.time_to_respawn, row.epoch_time_to_respawn)
+                    for row in result.scalars()
+                }
+            except Exception as e:
+                database_logger.error(f"Error while getting boss respawns of chat {chat_id}: {str(e)}")
+                return False
+
+        # Переопределение чата, затем boss_respawns, затем значения по умолчанию из intervals.py.
+        # Переопределения чата читаются одним запросом, поэтому кэшируем сразу всех боссов
+        for name in {boss_name, *self.intervals.names(), *overrides}:
+            self.chat_intervals.set(
+                (chat_id, name),
+                overrides.get(name) or self.intervals.get(name) or respawn_intervals.get(name),
+            )
+        return self.chat_intervals.get(key)
+
 
-                return result.scalars().all()
+    async def set_chat_boss_respawn(self, user_id, chat_id, boss_name, time_to_respawn: int, epoch_time_to_respawn: int) -> bool:
+        async with self.write_session() as session:
+            try:
+                await session.execute(self._upsert(ChatBossRespawn, ["chat_id", "boss_name"], {
+                    "chat_id": chat_id,
+                    "boss_name": boss_name,
+                    "time_to_respawn": time_to_respawn,
+                    "epoch_time_to_respawn": epoch_time_to_respawn,
+                }))
+                await session.commit()
+                self.chat_intervals.pop((chat_id, boss_name))
+                database_logger.success(f"User {user_id} set respawn of {boss_name} in chat {chat_id}")
+                return True
             except Exception as e:
-                database_logger.error(
-                    f"Error while getting all boss respawns by user {user_id}: {str(e)}"
+                database_logger.error(f"Error while setting chat boss respawn by user {user_id}: {str(e)}")
+                return False
+
+
+    async def delete_chat_boss_respawn(self, user_id, chat_id, boss_name) -> bool:
+        async with self.write_session() as session:
+            try:
+                await session.execute(
+                    delete(ChatBossRespawn)
+                    .filter(ChatBossRespawn.chat_id == chat_id, ChatBossRespawn.boss_name == boss_name)
                 )
+                await session.commit()
+                self.chat_intervals.pop((chat_id, boss_name))
+                database_logger.success(f"User {user_id} reset respawn of {boss_name} in chat {chat_id}")
+                return True
+            except Exception as e:
+                database_logger.error(f"Error while deleting chat boss respawn by user {user_id}: {str(e)}")
                 return False
 
 
 
-    async def add_timer(self, user_id, chat_id, boss_name, respawn_time) -> Timer:
+    async def get_chat_timezone(self, chat_id) -> str | None:
+        timezone = self.chat_timezones.get(chat_id, _missing)
+        if timezone is not _missing:
+            return timezone
+
         async with self.async_session() as session:
-            async with session.begin():
-                try:
-                    result = await session.execute(
-                        select(Timer).filter(
-                            Timer.chat_id == chat_id,
-                            Timer.boss_name == boss_name
-                        )
-                    )
-                    old_timer: Timer = result.scalars().first()
+            try:
+                result = await session.execute(
+                    select(ChatSettings.timezone).filter(ChatSettings.chat_id == chat_id)
+                )
+                timezone = result.scalar_one_or_none()
+            except Exception as e:
+                database_logger.error(f"Error while getting timezone of chat {chat_id}: {str(e)}")
+                return None
+        self.chat_timezones.set(chat_id, timezone)
+        return timezone
 
-                    if old_timer:
-                        database_logger.info(
-                            f"In db there was the timer {old_timer.timer_id} "
-                            f"with same parameters. Deleting old timer..."
-                        )
 
-                        await session.delete(old_timer)
-                        database_logger.success(
-                            f"User {user_id} autodeleted old timer with timer_id: {old_timer.timer_id}"
-                        )
+    async def set_chat_timezone(self, user_id, chat_id, timezone: str) -> bool:
+        async with self.write_session() as session:
+            try:
+                await session.execute(self._upsert(ChatSettings, ["chat_id"], {
+                    "chat_id": chat_id,
+                    "timezone": timezone,
+                }))
+                await session.commit()
+                self.chat_timezones.set(chat_id, timezone)
+                database_logger.success(f"User {user_id} set timezone {timezone} in chat {chat_id}")
+                return True
+            except Exception as e:
+                database_logger.error(f"Error while setting timezone of chat {chat_id} by user {user_id}: {str(e)}")
+                return False
 
 
-                except Exception as e:
-                    database_logger.error(
-                        f"Error while deleting timer {old_timer.timer_id} before setting"
-                        f" new one by user {user_id}: {str(e)}"
-                    )
-                    return False
 
+    def _insert(self, model, values: dict | list[dict]):
+        insert = sqlite_insert if self.engine.dialect.name == 'sqlite' else postgresql_insert
+        return insert(model).values(values)
+
+
+    def _upsert(self, model, index_elements: list, values: dict | list[dict]):
+        statement = self._insert(model, values)
+        columns = values[0] if isinstance(values, list) else values
+        return statement.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={name: statement.excluded[name] for name in columns},
+        )
+
+
+    async def add_timer(self, user_id, chat_id, boss_name, respawn_time, respawn_period=None, is_epoch=False) -> Timer:
+        timer_id = str(uuid.uuid4())[:10]
+        statement = self._upsert(
+            Timer,
+            [Timer.chat_id, Timer.boss_name],
+            dict(
+                timer_id=timer_id,
+                chat_id=chat_id,
+                boss_name=boss_name,
+                respawn_time=respawn_time,
+                respawn_period=respawn_period,
+                is_epoch=is_epoch,
+            ),
+        )
+
+        async def write(session):
+            result = await session.scalars(
+                statement.returning(Timer),
+                execution_options={"populate_existing": True},
+            )
+            return result.one()
+
+        old_timer_id = None
+
+        def after_commit(timer):
+            nonlocal old_timer_id
+            old_timer_id = self.timers.add(timer.timer_id, chat_id, boss_name)
+            self.chat_timers.put(chat_id, self._cached_timer(timer))
+
+        try:
+            timer = await self._write(write, after_commit)
+        except Exception as e:
+            database_logger.error(f"Error while adding timer by user {user_id}: {str(e)}")
+            return False
+
+        if old_timer_id:
+            database_logger.success(
+                f"User {user_id} autodeleted old timer with timer_id: {old_timer_id}"
+            )
+        database_logger.success(f"User {user_id} add timer with timer_id: {timer_id}")
+        return timer
+
+
+    async def add_timers(self, user_id, chat_id, respawn_times: dict[str, datetime], is_epoch=False) -> list[Timer]:
+        await self._flush_writes()
+        async with self.write_session() as session:
+            async with session.begin():
                 try:
-                    timer_id = str(uuid.uuid4())[:10]
-                    timer = Timer(
-                        timer_id=timer_id, 
-                        chat_id=chat_id, 
-                        boss_name=boss_name, 
-                        respawn_time=respawn_time
+                    statement = self._upsert(
+                        Timer,
+                        [Timer.chat_id, Timer.boss_name],
+                        [
+                            dict(
+                                timer_id=str(uuid.uuid4())[:10],
+                                chat_id=chat_id,
+                                boss_name=boss_name,
+                                respawn_time=respawn_time,
+                                respawn_period=None,
+                                is_epoch=is_epoch,
+                            )
+                            for boss_name, respawn_time in respawn_times.items()
+                        ],
+                    )
+                    result = await session.scalars(
+                        statement.returning(Timer),
+                        execution_options={"populate_existing": True},
                     )
-                    session.add(timer)
-                    database_logger.success(f"User {user_id} add timer with timer_id: {timer_id}")
+                    timers = result.all()
                     await session.commit()
-                    return timer
-                
+
+                    for timer in timers:
+                        self.timers.add(timer.timer_id, chat_id, timer.boss_name)
+                        self.chat_timers.put(chat_id, self._cached_timer(timer))
+                    database_logger.success(f"User {user_id} add {len(timers)} timers in chat {chat_id}")
+                    return timers
+
                 except Exception as e:
-                    database_logger.error(f"Error while adding timer by user {user_id}: {str(e)}")
+                    database_logger.error(f"Error while adding timers by user {user_id}: {str(e)}")
                     return False
-                
-        
+
+
     async def update_timer(self, timer: Timer, new_respawn_time) -> Timer:
-        async with self.async_session() as session:
-            async with session.begin():
-                try:
-                    timer.respawn_time = new_respawn_time
-                    session.add(timer)
-                    await session.commit()
-                    database_logger.success(
-                        f"Automatically updated timer with timer_id: {timer.timer_id}"
-                    )
-                    return timer
-                except Exception as e:
-                    database_logger.error(
-                        f"Error while updating timer {timer.timer_id}: {str(e)}"
-                    )
-                    return False
+        async def write(session):
+            result = await session.execute(
+                update(Timer)
+                .where(Timer.timer_id == timer.timer_id)
+                .values(respawn_time=new_respawn_time)
+            )
+            return result.rowcount
+
+        def after_commit(updated):
+            if updated:
+                timer.respawn_time = new_respawn_time
+                self.chat_timers.put(timer.chat_id, self._cached_timer(timer))
+
+        try:
+            if not await self._write(write, after_commit):
+                database_logger.error(f"Timer {timer.timer_id} to update was already deleted")
+                return False
+        except Exception as e:
+            database_logger.error(
+                f"Error while updating timer {timer.timer_id}: {str(e)}"
+            )
+            return False
+
+        database_logger.success(
+            f"Automatically updated timer with timer_id: {timer.timer_id}"
+        )
+        return timer
 
 
-    async def get_all_chat_timers(self, user_id, chat_id) -> list[Timer]:
+    async def stream_timers(self, batch_size: int):
         async with self.async_session() as session:
             try:
-                await self._delete_expired_timers(chat_id)
-                result = await session.execute(
-                    select(Timer)
-                    .filter(Timer.chat_id == chat_id)
-                    .order_by(
-                        Timer.respawn_time
-                    )
+                result = await session.stream_scalars(
+                    select(Timer).execution_options(yield_per=batch_size)
                 )
-                timers = result.scalars().all()
-                database_logger.success(f"User {user_id} got all chat timers")
-                
-                return timers
+                async for timers in result.partitions():
+                    for timer in timers:
+                        self.timers.add(timer.timer_id, timer.chat_id, timer.boss_name)
+                    yield timers
             except Exception as e:
-                database_logger.error(
-                    f"Error while getting all chat timers by user {user_id}: {str(e)}"
-                )
-                return False
-            
+                database_logger.error(f"Error while streaming timers: {str(e)}")
 
-    async def get_chat_timers(self, user_id, chat_id, count) -> list[Timer]:
+
+    @staticmethod
+    def _cached_timer(timer: Timer) -> CachedTimer:
+        return CachedTimer(
+            timer.timer_id,
+            timer.boss_name,
+            to_timestamp(timer.respawn_time),
+            timer.respawn_period,
+        )
+
+
+    async def _load_chat_timers(self, chat_id) -> list[CachedTimer]:
         async with self.async_session() as session:
-            try:
-                await self._delete_expired_timers(chat_id)
-                total_count_result = await session.execute(
-                    select(func.count())
-                    .select_from(Timer).filter(Timer.chat_id == chat_id)
+            result = await session.execute(chat_timers_query(chat_id))
+            return [
+                CachedTimer(
+                    timer_id,
+                    boss_name,
+                    to_timestamp(respawn_time),
+                    respawn_period,
                 )
-                total_count = total_count_result.scalar()
+                for timer_id, boss_name, respawn_time, respawn_period in result
+            ]
 
-                if count < total_count:
-                    result = await session.execute(
-                        select(Timer)
-                        .filter(Timer.chat_id == chat_id)
-                        .order_by(Timer.respawn_time)
-                        .limit(count)
-                    )
-                    timers = result.scalars().all()
-                else:
-                    timers = await self.get_all_chat_timers(user_id, chat_id)
 
-                database_logger.success(f"User {user_id} got {count} chat nearest timers")
-                return timers
+    async def get_all_chat_timers(self, user_id, chat_id, now: float | None = None) -> list[TimerRow]:
+        return await self.get_chat_timers(user_id, chat_id, 0, now)
+            
+
+    async def get_chat_timers(self, user_id, chat_id, count, now: float | None = None) -> list[TimerRow]:
+        now = now or now_ts()
+        timers = self.chat_timers.get(chat_id, count, now)
+        if timers is not None:
+            return timers
+
+        # Ближайший респавн циклического таймера считается от якоря, поэтому
+        # сортировка и LIMIT делаются в памяти, а не в запросе
+        self.chat_timers.begin_load(chat_id)
+        try:
+            loaded = await self._load_chat_timers(chat_id)
+        except Exception as e:
+            self.chat_timers.abort_load(chat_id)
+            database_logger.error(
+                f"Error while getting chat nearest timers by user {user_id}: {str(e)}"
+            )
+            return False
+        self.chat_timers.finish_load(chat_id, loaded)
+        database_logger.success(f"User {user_id} got {count or 'all'} chat nearest timers")
+        return upcoming(loaded, count, now)
+
+
+    async def check_chat_timers_cache(self, count: int) -> int:
+        stale = 0
+        for chat_id in self.chat_timers.next_to_check(count):
+            self.chat_timers.begin_load(chat_id)
+            try:
+                timers = await self._load_chat_timers(chat_id)
             except Exception as e:
-                database_logger.error(
-                    f"Error while getting chat nearest timers by user {user_id}: {str(e)}"
-                )
-                return False
+                self.chat_timers.abort_load(chat_id)
+                database_logger.error(f"Error while checking timers cache of chat {chat_id}: {str(e)}")
+                break
+            if self.chat_timers.finish_check(chat_id, timers) is False:
+                stale += 1
+                database_logger.warning(f"Timers cache of chat {chat_id} was stale and has been reloaded")
+        return stale
 
 
     async def delete_timer(self, user_id, timer_id) -> bool:
-        async with self.async_session() as session:
-            async with session.begin():
-                try:
-                    result = await session.execute(
-                        select(Timer).filter(
-                            Timer.timer_id == timer_id
-                        )
-                    )
-                    timer = result.scalars().first()
-
-                    if not timer:
-                        database_logger.error(
-                            f"User {user_id} tried to "
-                            f"delete non-existent timer_id: {timer_id}"
-                        )
-                        return False
-
-                    await session.delete(timer)
-                    await session.commit()
-                    database_logger.success(
-                        f"User {user_id} deleted timer with timer_id: {timer_id}"
-                    )
-                    return True
-                
-                except Exception as e:
-                    database_logger.error(
-                        f"Error while deleting timer {timer_id} by user {user_id}: {str(e)}"
-                    )
-                    return False
+        async def write(session):
+            result = await session.execute(
+                delete(Timer)
+                .where(Timer.timer_id == timer_id)
+                .returning(Timer.chat_id)
+                .execution_options(synchronize_session=False)
+            )
+            return result.scalar_one_or_none()
+
+        def after_commit(chat_id):
+            if chat_id is not None:
+                self.timers.cancel(timer_id)
+                self.chat_timers.remove(timer_id, chat_id)
+
+        try:
+            chat_id = await self._write(write, after_commit)
+        except Exception as e:
+            database_logger.error(
+                f"Error while deleting timer {timer_id} by user {user_id}: {str(e)}"
+            )
+            return False
+
+        if chat_id is None:
+            database_logger.error(
+                f"User {user_id} tried to "
+                f"delete non-existent timer_id: {timer_id}"
+            )
+            return False
+
+        database_logger.success(
+            f"User {user_id} deleted timer with timer_id: {timer_id}"
+        )
+        return True
     
     
     async def delete_all_timers_in_chat(self, chat_id) -> bool:
-        async with self.async_session() as session:
+        await self._flush_writes()
+        async with self.write_session() as session:
             async with session.begin():
                 try:
                     result = await session.execute(
@@ -253,6 +557,7 @@ class DataBaseAPI():
                     timers = result.scalars().all()
                     
                     if not timers:
+                        self.chat_timers.clear_chat(chat_id)
                         database_logger.info(f"In chat {chat_id} there is no timers")
                         return "no_timers"
 
@@ -260,6 +565,9 @@ class DataBaseAPI():
                         await session.delete(timer)
                 
                     await session.commit()
+                    for timer in timers:
+                        self.timers.cancel(timer.timer_id)
+                    self.chat_timers.clear_chat(chat_id)
                     database_logger.success(f"In chat {chat_id} all timers was deleted")
                     return True
                 except Exception as e:
@@ -269,64 +577,98 @@ class DataBaseAPI():
                     return False
 
 
-    async def _get_timer(self, timer: Timer) -> Timer:
+    async def delete_timers(self, timer_ids: list[str]) -> bool:
+        await self._flush_writes()
+        async with self.write_session() as session:
+            async with session.begin():
+                try:
+                    await session.execute(
+                        delete(Timer).where(Timer.timer_id.in_(timer_ids))
+                    )
+                    await session.commit()
+                    for timer_id in timer_ids:
+                        self.timers.cancel(timer_id)
+                        self.chat_timers.remove(timer_id)
+                    database_logger.success(f"Deleted {len(timer_ids)} timers")
+                    return True
+                except Exception as e:
+                    database_logger.error(f"Error while deleting {len(timer_ids)} timers: {str(e)}")
+                    return False
+
+
+    async def is_timer_alive(self, timer_id, chat_id, boss_name) -> bool:
+        alive = self.timers.is_alive(timer_id)
+        if alive is not None:
+            return alive
+
+        existing_timer = await self._get_timer(timer_id)
+        if existing_timer:
+            self.timers.add(timer_id, chat_id, boss_name)
+        else:
+            self.timers.cancel(timer_id)
+        return bool(existing_timer)
+
+
+    async def _get_timer(self, timer_id) -> Timer:
         async with self.async_session() as session:
             async with session.begin():
                 try:
                     result = await session.execute(
                         select(Timer)
-                        .filter(Timer.timer_id == timer.timer_id)
+                        .filter(Timer.timer_id == timer_id)
                     )
                     existing_timer = result.scalars().first()
                     
                     if not existing_timer:
-                        database_logger.info(f"Timer {timer.timer_id} was deleted")
+                        database_logger.info(f"Timer {timer_id} was deleted")
                         return False
                     
                     database_logger.success(
-                        f"Timer {timer.timer_id} is present in Database"
+                        f"Timer {timer_id} is present in Database"
                     )
-                    return timer
+                    return existing_timer
                 except Exception as e:
                     database_logger.error(
-                        f"Error while updating timer {timer.timer_id}: {str(e)}"
+                        f"Error while updating timer {timer_id}: {str(e)}"
                     )
                     return False
 
 
 
-    async def _delete_expired_timers(self, chat_id) -> bool:
-        async with self.async_session() as session:
-            try:
-                now = datetime.now() - timedelta(seconds=5)
+    async def delete_expired_timers(self, batch_size: int, grace: float = 5) -> int:
+        now = from_timestamp(now_ts() - grace)
+        deleted = 0
+        try:
+            while True:
+                async with self.write_session() as session:
+                    async with session.begin():
+                        expired = expired_timers_query(now, batch_size)
+                        result = await session.execute(
+                            delete(Timer)
+                            .where(Timer.timer_id.in_(expired))
+                            .returning(Timer.timer_id)
+                            .execution_options(synchronize_session=False)
+                        )
+                        timer_ids = result.scalars().all()
 
-                result = await session.execute(
-                    select(Timer)
-                    .filter(Timer.respawn_time < now)
-                )
-                expired_timers = result.scalars().all()
-                
-                if not expired_timers:
-                    database_logger.info(f"In chat {chat_id} There is no expired timers in Database")
+                for timer_id in timer_ids:
+                    self.timers.cancel(timer_id)
+                    self.chat_timers.remove(timer_id)
+                deleted += len(timer_ids)
+                if len(timer_ids) < batch_size:
+                    break
 
-                for timer in expired_timers:
-                        timer_id = timer.timer_id
-                        await session.delete(timer)
-                        database_logger.info(
-                            f"Expired timer {timer_id} was deleted"
-                        )
-                
-                await session.commit()
-                return True
-            
-            except Exception as e:
-                await session.rollback()
-                database_logger.error(f"Error while deleting expired timers {str(e)}")
-                return False
+            if deleted:
+                database_logger.info(f"{deleted} expired timers were deleted")
+            return deleted
+
+        except Exception as e:
+            database_logger.error(f"Error while deleting expired timers {str(e)}")
+            return deleted
 
 
     async def add_userinfo(self, user_id, user_nickname, user_firstname) -> User:
-        async with self.async_session() as session:
+        async with self.write_session() as session:
             async with session.begin():
                 try:
                     result = await session.execute(
@@ -353,6 +695,21 @@ class DataBaseAPI():
                     return False
 
 
+    async def add_userinfos(self, users: list[dict]) -> int:
+        async with self.write_session() as session:
+            async with session.begin():
+                try:
+                    result = await session.execute(
+                        self._insert(User, users).on_conflict_do_nothing(index_elements=[User.user_id])
+                    )
+                    added = max(result.rowcount, 0)
+                    database_logger.success(f"{added} of {len(users)} users were added to Database")
+                    return added
+                except Exception as e:
+                    database_logger.error(f"Error while adding {len(users)} users: {str(e)}")
+                    return False
+
+
     async def get_userinfo(self, user_id) -> User:
         async with self.async_session() as session:
             try:
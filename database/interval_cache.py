@@ -0,0 +1,38 @@
+from database.models import BossRespawn
+
+
+# Копия таблицы boss_respawns в памяти. version - агрегаты таблицы на момент
+# загрузки (max(updated_at), count и суммы интервалов: правка в ту же секунду
+# не меняет updated_at), generation растёт при каждой перезагрузке
+class IntervalCache:
+    def __init__(self):
+        self._bosses: dict[str, BossRespawn] = {}
+        self.version = None
+        self.generation = 0
+
+    def __contains__(self, boss_name: str) -> bool:
+        return boss_name in self._bosses
+
+    def __len__(self) -> int:
+        return len(self._bosses)
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    def replace(self, bosses: list[BossRespawn], version):
+        self._bosses = {boss.boss_name: boss for boss in bosses}
+        self.version = version
+        self.generation += 1
+
+    def get(self, boss_name: str) -> tuple[int, int] | None:
+        boss = self._bosses.get(boss_name)
+        if boss is None:
+            return None
+        return boss.time_to_respawn, boss.epoch_time_to_respawn
+
+    def bosses(self) -> list[BossRespawn]:
+        return list(self._bosses.values())
+
+    def names(self) -> list[str]:
+        return list(self._bosses)
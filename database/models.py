@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import NamedTuple
 
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint, false, func
 
 Base = declarative_base()
 
@@ -11,24 +12,57 @@ class BossRespawn(Base):
     boss_name: Mapped[str] = mapped_column(primary_key=True)
     time_to_respawn: Mapped[int]
     epoch_time_to_respawn: Mapped[int] 
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     timers = relationship("Timer", back_populates="boss_respawns")
 
 
+# Интервалы, переопределённые для конкретного чата
+class ChatBossRespawn(Base):
+    __tablename__ = "chat_boss_respawns"
+
+    chat_id: Mapped[str] = mapped_column(primary_key=True)
+    boss_name: Mapped[str] = mapped_column(ForeignKey("boss_respawns.boss_name"), primary_key=True)
+    time_to_respawn: Mapped[int]
+    epoch_time_to_respawn: Mapped[int]
+
+
 class Timer(Base):
     __tablename__ = "timers"
+    __table_args__ = (
+        UniqueConstraint("chat_id", "boss_name", name="uq_timers_chat_id_boss_name"),
+        Index("ix_timers_chat_id_respawn_time", "chat_id", "respawn_time"),
+    )
 
     timer_id: Mapped[str] = mapped_column(primary_key=True, index=True)
     chat_id: Mapped[str] = mapped_column(index=True)
     boss_name: Mapped[str] = mapped_column(ForeignKey("boss_respawns.boss_name"))
-    respawn_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    respawn_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # respawn_time - якорь (первый респавн), respawn_period - период в секундах, NULL у разовых таймеров
+    respawn_period: Mapped[int | None]
+    is_epoch: Mapped[bool] = mapped_column(default=False, server_default=false())
 
     boss_respawns = relationship("BossRespawn", back_populates="timers")
 
 
+class TimerRow(NamedTuple):
+    timer_id: str
+    boss_name: str
+    respawn_at: float
+
+
+class ChatSettings(Base):
+    __tablename__ = "chat_settings"
+
+    chat_id: Mapped[str] = mapped_column(primary_key=True)
+    timezone: Mapped[str | None]
+
+
 class User(Base):
     __tablename__ = "users"
 
     user_id: Mapped[str] = mapped_column(primary_key=True, index=True)
     user_nickname: Mapped[str]
-    user_firstname: Mapped[str]
\ No newline at end of file
+    user_firstname: Mapped[str]
@@ -0,0 +1,144 @@
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config import (
+    DATABASE_ECHO,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_STATEMENT_CACHE_SIZE,
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT,
+)
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class PoolMetrics:
+    def __init__(self, samples: int = 1000):
+        self._waits: deque[float] = deque(maxlen=samples)
+        self.reset()
+
+    def reset(self):
+        self._waits.clear()
+        self.acquired = 0
+        self.failed = 0
+        self.max_checked_out = 0
+        self.max_overflow = 0
+
+    def observe(self, wait: float, checked_out: int, overflow: int):
+        self.acquired += 1
+        self._waits.append(wait)
+        self.max_checked_out = max(self.max_checked_out, checked_out)
+        self.max_overflow = max(self.max_overflow, overflow)
+
+    def snapshot(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "failed": self.failed,
+            "p50_wait": percentile(self._waits, 0.5),
+            "p99_wait": percentile(self._waits, 0.99),
+            "max_wait": max(self._waits, default=0.0),
+            "max_checked_out": self.max_checked_out,
+            "max_overflow": self.max_overflow,
+        }
+
+
+# Пул соединений, который замеряет время получения соединения (ожидание
+# свободного слота, создание соединения, pre-ping) и пиковую загрузку
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception:
+            self.metrics.failed += 1
+            raise
+        self.metrics.observe(time.perf_counter() - started, self.checkedout(), max(self.overflow(), 0))
+        return connection
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def engine_options(database_url: str, writer: bool = False) -> dict:
+    options = dict(echo=DATABASE_ECHO, future=True)
+    url = make_url(database_url)
+    # SQLite в памяти работает через StaticPool, настраивать нечего
+    if url.get_backend_name() == 'sqlite' and not is_sqlite_file(database_url):
+        return options
+
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT,
+        pool_recycle=DATABASE_POOL_RECYCLE,
+        pool_pre_ping=DATABASE_POOL_PRE_PING,
+    )
+    # В SQLite писать может только одно соединение за раз, поэтому все записи
+    # выстраиваются в очередь к единственному соединению писателя
+    if writer:
+        options.update(pool_size=1, max_overflow=0)
+    if url.get_driver_name() == 'asyncpg':
+        options['connect_args'] = {
+            'statement_cache_size': DATABASE_STATEMENT_CACHE_SIZE,
+            'prepared_statement_cache_size': DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL: читатели не блокируют писателя и наоборот
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.close()
+
+
+# pysqlite сам открывает транзакцию только перед DML и фиксирует её на
+# RELEASE внешнего savepoint. Писатель управляет транзакциями сам и сразу
+# берёт блокировку записи
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(connection):
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+# Возвращает (engine, write_engine). Для PostgreSQL это один и тот же движок,
+# для файловой SQLite - пул читателей и отдельный движок с одним соединением
+def create_engines(database_url: str) -> tuple[AsyncEngine, AsyncEngine]:
+    engine = create_async_engine(database_url, **engine_options(database_url))
+    if not is_sqlite_file(database_url):
+        return engine, engine
+
+    write_engine = create_async_engine(database_url, **engine_options(database_url, writer=True))
+    for sqlite_engine in (engine, write_engine):
+        event.listen(sqlite_engine.sync_engine, 'connect', _set_sqlite_pragmas)
+    event.listen(write_engine.sync_engine, 'connect', _disable_pysqlite_transactions)
+    event.listen(write_engine.sync_engine, 'begin', _begin_immediate)
+    return engine, write_engine
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+
+# Состояние таймеров в памяти процесса, чтобы не спрашивать БД на каждом
+# срабатывании. None означает промах: о таймере ничего не известно
+class TimerRegistry:
+    def __init__(self, max_cancelled: int = 10000):
+        self._live: dict[str, tuple[str, str]] = {}
+        self._slots: dict[tuple[str, str], str] = {}
+        self._cancelled: OrderedDict[str, None] = OrderedDict()
+        self._max_cancelled = max_cancelled
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def add(self, timer_id: str, chat_id: str, boss_name: str) -> str | None:
+        replaced = self._slots.get((chat_id, boss_name))
+        if replaced is not None and replaced != timer_id:
+            self.cancel(replaced)
+        self._cancelled.pop(timer_id, None)
+        self._live[timer_id] = (chat_id, boss_name)
+        self._slots[(chat_id, boss_name)] = timer_id
+        return replaced
+
+    def cancel(self, timer_id: str):
+        slot = self._live.pop(timer_id, None)
+        if slot is not None and self._slots.get(slot) == timer_id:
+            del self._slots[slot]
+        self._cancelled[timer_id] = None
+        self._cancelled.move_to_end(timer_id)
+        if len(self._cancelled) > self._max_cancelled:
+            self._cancelled.popitem(last=False)
+
+    def is_alive(self, timer_id: str) -> bool | None:
+        if timer_id in self._live:
+            return True
+        if timer_id in self._cancelled:
+            return False
+        return None
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.pool import percentile
+
+WriteOperation = Callable[[AsyncSession], Awaitable[Any]]
+AfterCommit = Callable[[Any], None]
+
+
+class WriteMetrics:
+    def __init__(self, samples: int = 1000):
+        self._latencies: deque[float] = deque(maxlen=samples)
+        self.reset()
+
+    def reset(self):
+        self._latencies.clear()
+        self.operations = 0
+        self.commits = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def observe(self, latency: float, failed: bool):
+        self.operations += 1
+        self.failed += failed
+        self._latencies.append(latency)
+
+    def snapshot(self) -> dict:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "operations": self.operations,
+            "commits": self.commits,
+            "failed": self.failed,
+            "commits_per_second": self.commits / elapsed,
+            "p50_latency": percentile(self._latencies, 0.5),
+            "p99_latency": percentile(self._latencies, 0.99),
+        }
+
+
+# Записи, пришедшие в течение delay секунд, выполняются одной транзакцией,
+# каждая в своём savepoint: ошибка одной не откатывает остальные.
+# submit возвращает результат только после commit всей пачки. after_commit
+# вызывается сразу после commit в порядке записей, до пробуждения вызывающих
+class WriteBatcher:
+    def __init__(self, session_factory, delay: float, max_batch: int, metrics: WriteMetrics):
+        self._session_factory = session_factory
+        self._delay = delay
+        self._max_batch = max_batch
+        self._metrics = metrics
+        self._pending: list[tuple[WriteOperation, AfterCommit | None, asyncio.Future]] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, operation: WriteOperation, after_commit: AfterCommit | None = None):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operation, after_commit, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def flush(self):
+        async with self._lock:
+            while self._pending:
+                batch = self._pending[:self._max_batch]
+                del self._pending[:self._max_batch]
+                await self._commit(batch)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self._delay)
+        self._flush_task = None
+        await self.flush()
+
+    async def _commit(self, batch: list[tuple[WriteOperation, AfterCommit | None, asyncio.Future]]):
+        results = []
+        try:
+            async with self._session_factory() as session:
+                async with session.begin():
+                    for operation, after_commit, future in batch:
+                        try:
+                            async with session.begin_nested():
+                                results.append((future, after_commit, await operation(session), None))
+                        except Exception as e:
+                            results.append((future, after_commit, None, e))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._metrics.commits += 1
+        for future, after_commit, result, error in results:
+            if error is None and after_commit is not None:
+                try:
+                    after_commit(result)
+                except Exception as e:
+                    error = e
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -7,6 +7,7 @@ from telethon.tl.functions.bots import SetBotCommandsRequest, SetBotMenuButtonRe
 from telethon.tl.types import BotCommand, BotCommandScopeDefault, BotMenuButtonCommands
 
 from backend_logic import (
+    bind_client,
     set_timer, 
     init_db, 
     get_bosses, 
@@ -14,12 +15,39 @@ from backend_logic import (
     delete_all_timers,
     get_chat_timers,
     epochs_timers_start,
+    set_chat_interval,
+    set_chat_timezone,
     start_chat,
 )
 
+from utils.command_router import CommandRouter
 from utils.logger import backend_logger
 from utils.get_client import get_client
 
+INFO_TEXT = "Bot này được tạo ra để hỗ trợ trò chơi Lineage2M. Người tạo: @egopbi (Eeee Gorka)"
+HELP_TEXT = (
+    "**Các lệnh có sẵn:**\n\n"
+    "/bosses\n- Hiển thị danh sách boss\n\n"
+    "-------------------------------------\n"
+    "/set <tên_boss> <giờ_phát_sinh>\n- Đặt thời gian hồi sinh cho boss. Định dạng HH:MM. Nếu không có giờ sẽ lấy thời điểm hiện tại\n\n"
+    "-------------------------------------\n"
+    "/get <số_lượng>\n- Hiển thị <số_lượng> boss sắp xuất hiện\n\n"
+    "-------------------------------------\n"
+    "/get\n- Hiển thị tất cả các boss đã được đặt\n\n"
+    "-------------------------------------\n"
+    "/delete <id>\n- Xóa boss theo ID\n\n"
+    "-------------------------------------\n"
+    "/all_start\n- Bắt đầu tất cả hẹn giờ\n\n"
+    "-------------------------------------\n"
+    "/interval <tên_boss> <giờ> <giờ_kỷ_nguyên_mới>\n- Đặt thời gian hồi sinh riêng cho nhóm. Không có giờ - khôi phục mặc định\n\n"
+    "-------------------------------------\n"
+    "/timezone <múi_giờ>\n- Đặt múi giờ hiển thị của nhóm, ví dụ `Asia/Ho_Chi_Minh` hoặc `UTC+7`. Không có múi giờ - xem múi giờ hiện tại\n\n"
+    "-------------------------------------\n"
+    "/info\n- Thông tin về bot\n\n"
+    "-------------------------------------\n"
+    "/help\n- Hiển thị hướng dẫn"
+)
+
 
 async def shutdown(signal_name):
     backend_logger.info(f"Nhận tín hiệu thoát {signal_name}")
@@ -39,6 +67,7 @@ async def shutdown(signal_name):
 async def main():
     try:
         client = await get_client(as_bot=True)
+        bind_client(client)
         backend_logger.success("Bot khởi động thành công")
 
         async def set_bot_commands():
@@ -49,6 +78,8 @@ async def main():
                 BotCommand(command="delete", description="Xóa hẹn giờ theo ID"),
                 BotCommand(command="bosses", description="Danh sách tất cả boss"),
                 BotCommand(command="all_start", description="Bắt đầu hẹn giờ cho tất cả boss"),
+                BotCommand(command="interval", description="Đặt thời gian hồi sinh riêng cho nhóm"),
+                BotCommand(command="timezone", description="Múi giờ hiển thị của nhóm"),
                 BotCommand(command="help", description="Mô tả lệnh"),
                 BotCommand(command="info", description="Thông tin về bot"),
             ]
@@ -63,18 +94,21 @@ async def main():
         if await set_bot_commands():
             backend_logger.success("Các lệnh bot đã được thiết lập thành công")
 
-        @client.on(events.NewMessage(pattern=r'/bosses'))
-        async def get_bosses_command(event):
+        me = await client.get_me()
+        router = CommandRouter(username=me.username)
+
+        @router.command('bosses')
+        async def get_bosses_command(event, match):
             chat_id = str(event.chat_id)
             user_id = str(event.sender_id)
             backend_logger.info(f"Trong chat {chat_id} người dùng {user_id} dùng `{event.message.message}`")
             await get_bosses(chat_id=chat_id, user_id=user_id, event=event)
 
-        @client.on(events.NewMessage(pattern=r'/set\s+(.+?)\s*(\d{1,2}:\d{2})?$'))
-        async def set_timer_command(event):
+        @router.command('set', r'(.+?)\s*(\d{1,2}:\d{2})?')
+        async def set_timer_command(event, match):
             chat_id = str(event.chat_id)
-            boss_name = str(event.pattern_match.group(1)).title()
-            kill_time_str = event.pattern_match.group(2)
+            boss_name = str(match.group(1))
+            kill_time_str = match.group(2)
             user_id = str(event.sender_id)
 
             backend_logger.info(f"Trong chat {chat_id} người dùng {user_id} dùng `{event.message.message}`")
@@ -86,8 +120,8 @@ async def main():
                 event=event,
             )
 
-        @client.on(events.NewMessage(pattern='/all_start'))
-        async def epochs_timers_start_command(event):
+        @router.command('all_start')
+        async def epochs_timers_start_command(event, match):
             chat_id = str(event.chat_id)
             user_id = str(event.sender_id)
             await epochs_timers_start(
@@ -96,13 +130,37 @@ async def main():
                 event=event
             )
 
-        @client.on(events.NewMessage(pattern=r'^/delete(?!_)\s*([\w-]+)$'))
-        async def delete_timer_command(event):
+        @router.command('interval', r'(.+?)(?:\s+(\d{1,2})(?:\s+(\d{1,2}))?)?')
+        async def set_chat_interval_command(event, match):
+            chat_id = str(event.chat_id)
+            user_id = str(event.sender_id)
+            hours, epoch_hours = match.group(2), match.group(3)
+
+            backend_logger.info(f"Trong chat {chat_id} người dùng {user_id} dùng `{event.message.message}`")
+            await set_chat_interval(
+                chat_id=chat_id,
+                boss_name=str(match.group(1)),
+                hours=int(hours) if hours else None,
+                epoch_hours=int(epoch_hours) if epoch_hours else None,
+                user_id=user_id,
+                event=event,
+            )
+
+        @router.command('timezone', r'(\S+)?')
+        async def set_chat_timezone_command(event, match):
+            chat_id = str(event.chat_id)
+            user_id = str(event.sender_id)
+
+            backend_logger.info(f"Trong chat {chat_id} người dùng {user_id} dùng `{event.message.message}`")
+            await set_chat_timezone(chat_id=chat_id, timezone=match.group(1), user_id=user_id, event=event)
+
+        @router.command('delete', r'([\w-]+)')
+        async def delete_timer_command(event, match):
             chat_id = str(event.chat_id)
             user_id = str(event.sender_id)
 
             try:
-                timer_id = str(event.pattern_match.group(1))
+                timer_id = str(match.group(1))
             except ValueError:
                 await event.reply("❌ Nhập ID hợp lệ")
                 backend_logger.error(
@@ -118,18 +176,18 @@ async def main():
                 event=event,
             )
 
-        @client.on(events.NewMessage(pattern=r'/delete_all_timers'))
-        async def delete__all_timers_command(event):
+        @router.command('delete_all_timers')
+        async def delete__all_timers_command(event, match):
             chat_id = str(event.chat_id)
             user_id = str(event.sender_id)
 
             backend_logger.info(f"Trong chat {chat_id} người dùng {user_id} dùng `{event.message.message}`")
             await delete_all_timers(chat_id=chat_id, user_id=user_id, event=event)
 
-        @client.on(events.NewMessage(pattern=r'^/get(?!_my)(?:@\w+)?(?:\s+(\d+))?$'))
-        async def get_chat_timers_command(event):
+        @router.command('get', r'(\d+)?')
+        async def get_chat_timers_command(event, match):
             chat_id = str(event.chat_id)
-            timer_numbers = event.pattern_match.group(1)
+            timer_numbers = match.group(1)
             user_id = str(event.sender_id)
 
             if timer_numbers is None:
@@ -152,40 +210,21 @@ async def main():
                 event=event
             )
 
-        @client.on(events.NewMessage(pattern=r'^/start(@\w+)?$'))
-        async def start_command(event):
+        @router.command('start', r'')
+        async def start_command(event, match):
             chat_id = str(event.chat_id)
             chat = await event.get_chat()
-            participants = await client.get_participants(chat)
-            await start_chat(chat_id=chat_id, chat=chat, participants=participants, event=event)
+            await start_chat(chat_id=chat_id, chat=chat, client=client, event=event)
 
-        @client.on(events.NewMessage(pattern=r'^/info(@\w+)?$'))
-        async def info_command(event):
-            await event.reply(
-                "Bot này được tạo ra để hỗ trợ trò chơi Lineage2M. Người tạo: @egopbi (Eeee Gorka)"
-            )
+        @router.command('info', r'')
+        async def info_command(event, match):
+            await event.reply(INFO_TEXT)
 
-        @client.on(events.NewMessage(pattern=r'^/help(@\w+)?$'))
-        async def help_command(event):
-            help_text = (
-                "**Các lệnh có sẵn:**\n\n"
-                "/bosses\n- Hiển thị danh sách boss\n\n"
-                "-------------------------------------\n"
-                "/set <tên_boss> <giờ_phát_sinh>\n- Đặt thời gian hồi sinh cho boss. Định dạng HH:MM. Nếu không có giờ sẽ lấy thời điểm hiện tại\n\n"
-                "-------------------------------------\n"
-                "/get <số_lượng>\n- Hiển thị <số_lượng> boss sắp xuất hiện\n\n"
-                "-------------------------------------\n"
-                "/get\n- Hiển thị tất cả các boss đã được đặt\n\n"
-                "-------------------------------------\n"
-                "/delete <id>\n- Xóa boss theo ID\n\n"
-                "-------------------------------------\n"
-                "/all_start\n- Bắt đầu tất cả hẹn giờ\n\n"
-                "-------------------------------------\n"
-                "/info\n- Thông tin về bot\n\n"
-                "-------------------------------------\n"
-                "/help\n- Hiển thị hướng dẫn"
-            )
-            await event.reply(help_text)
+        @router.command('help', r'')
+        async def help_command(event, match):
+            await event.reply(HELP_TEXT)
+
+        client.add_event_handler(router.dispatch, events.NewMessage(func=router.is_command))
 
         await client.run_until_disconnected()
         backend_logger.success("Bot đang hoạt động")
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Общая обвязка для scripts/bench_*.py. Запускать из корня репозитория:
+#   python scripts/bench_get.py
+# По умолчанию работают на временной SQLite-базе; чтобы сравнить с PostgreSQL,
+# передайте DATABASE_URL в окружении (значение из .env не используется)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('API_ID', '0')
+os.environ.setdefault('API_HASH', 'bench')
+os.environ.setdefault('BOT_TOKEN', 'bench')
+os.environ.setdefault(
+    'DATABASE_URL',
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}",
+)
+os.environ['DATABASE_ECHO'] = ''
+
+
+# Убирает вывод логов бота, чтобы он не мешал замерам
+def quiet():
+    import utils.logger  # noqa: F401 - регистрирует синки, которые снимаем
+    from loguru import logger
+    logger.remove()
+
+
+# Схема и boss_respawns, как при запуске бота. Без boss_respawns PostgreSQL
+# отклоняет таймеры по внешнему ключу, а SQLite его не проверяет
+async def setup_database(db):
+    assert await db.create_tables(), "create_tables failed"
+    assert await db.initialize_boss_respawns(), "initialize_boss_respawns failed"
+
+
+# count разных пар (chat_id, boss_name) с настоящими именами боссов:
+# сначала все боссы одного чата, затем следующий чат
+def timer_keys(count: int, chat_prefix: str = "chat") -> list[tuple[str, str]]:
+    from intervals import respawn_intervals
+
+    names = list(respawn_intervals)
+    return [(f"{chat_prefix}{key // len(names)}", names[key % len(names)]) for key in range(count)]
+
+
+async def count_timers(db, chat_prefix: str) -> int:
+    from sqlalchemy import func, select
+
+    from database.models import Timer
+
+    async with db.async_session() as session:
+        result = await session.execute(
+            select(func.count()).select_from(Timer).filter(Timer.chat_id.startswith(chat_prefix))
+        )
+        return result.scalar()
+
+
+def boss_names(count: int) -> list[str]:
+    from intervals import respawn_intervals
+
+    names = list(respawn_intervals)
+    assert count <= len(names), f"only {len(names)} bosses are known"
+    return names[:count]
+
+
+# Считает запросы к БД и выдачи соединений из пула для движка
+def count_round_trips(engine) -> Counter:
+    from sqlalchemy import event
+
+    counts = Counter()
+    event.listen(engine.sync_engine, 'before_cursor_execute', lambda *args: counts.update(('statements',)))
+    event.listen(engine.sync_engine, 'checkout', lambda *args: counts.update(('checkouts',)))
+    return counts
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def report(title: str, samples: list[float], file=None):
+    print(
+        f"{title:<40} n={len(samples):<6} "
+        f"p50 {percentile(samples, 0.5) * 1e3:8.3f} ms  "
+        f"p99 {percentile(samples, 0.99) * 1e3:8.3f} ms  "
+        f"mean {sum(samples) / len(samples) * 1e3:8.3f} ms",
+        file=file or sys.stdout,
+    )
+
+
+def per_call(function, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        function()
+    return (time.perf_counter() - started) / number
+
+
+def report_per_call(title: str, seconds: float):
+    print(f"{title:<40} {seconds * 1e6:10.2f} us/call")
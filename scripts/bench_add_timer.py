@@ -0,0 +1,55 @@
+import asyncio
+import sys
+import time
+
+import _bench
+
+# add_timer (INSERT ... ON CONFLICT DO UPDATE): новый таймер, замена таймера
+# того же босса и параллельные /set одного босса в одном чате. Имена боссов
+# настоящие: на PostgreSQL timers.boss_name проверяется внешним ключом
+#   python scripts/bench_add_timer.py [calls]
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+
+async def main():
+    _bench.quiet()
+    from database.db_logic import DataBaseAPI
+    from utils.time_helper import from_timestamp, now_ts
+
+    db = DataBaseAPI()
+    try:
+        await _bench.setup_database(db)
+        respawn_time = from_timestamp(now_ts() + 3600)
+        new_timers = _bench.timer_keys(CALLS, "new/")
+
+        for title, key in (
+            ("add_timer, new timer", lambda call: new_timers[call]),
+            ("add_timer, same boss", lambda call: ("same", "Breka")),
+        ):
+            samples = []
+            for call in range(CALLS):
+                chat_id, boss_name = key(call)
+                started = time.perf_counter()
+                assert await db.add_timer("bench", chat_id, boss_name, respawn_time)
+                samples.append(time.perf_counter() - started)
+            _bench.report(title, samples)
+            print(f"{'':<40} {CALLS / sum(samples):.0f} calls/s")
+        assert await _bench.count_timers(db, "new/") == CALLS
+        assert await _bench.count_timers(db, "same") == 1
+
+        started = time.perf_counter()
+        timers = await asyncio.gather(*(
+            db.add_timer("bench", "concurrent", "Breka", respawn_time) for _ in range(CALLS)
+        ))
+        elapsed = time.perf_counter() - started
+        rows = await db._load_chat_timers("concurrent")
+        print(f"{'add_timer, concurrent same boss':<40} {CALLS / elapsed:.0f} calls/s, "
+              f"{sum(1 for timer in timers if timer)} ok, {len(rows)} row(s) left")
+        assert all(timers) and len(rows) == 1
+    finally:
+        await db.engine.dispose()
+        await db.write_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+import sys
+
+import _bench
+
+# Поиск имени босса в BossNameIndex по видам запросов; для опечаток - сравнение
+# с перебором всех боссов через edit_distance
+#   python scripts/bench_boss_index.py [iterations]
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def main():
+    from intervals import respawn_intervals
+    from utils.boss_index import MAX_EDIT_DISTANCE, BossNameIndex, edit_distance, normalize
+
+    index = BossNameIndex(respawn_intervals)
+    keys = [normalize(name) for name in respawn_intervals]
+
+    def linear_scan(query):
+        key = normalize(query)
+        return sorted(
+            (distance, name) for name, distance in ((name, edit_distance(key, name)) for name in keys)
+            if distance <= MAX_EDIT_DISTANCE
+        )
+
+    print(f"{len(index)} bosses")
+    for title, query in (
+        ("exact", "Breka"),
+        ("initials alias", "IK"),
+        ("unique prefix", "Infec"),
+        ("typo, distance 1", "Brekka"),
+        ("typo, transposition", "Infected Kurma"),
+        ("unknown name", "Zzzzzzzz"),
+    ):
+        print(f"{title:<20} {query!r:<18} -> {index.resolve(query)}")
+        _bench.report_per_call("  index", _bench.per_call(lambda: index.resolve(query), ITERATIONS))
+    for query in ("Brekka", "Infected Kurma"):
+        _bench.report_per_call(f"  linear scan {query!r}", _bench.per_call(lambda: linear_scan(query), ITERATIONS // 10))
+    _bench.report_per_call("index rebuild", _bench.per_call(lambda: BossNameIndex(respawn_intervals), 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import time
+
+import _bench
+
+# /get: задержка и число запросов к БД на вызов для прежней схемы (сведения о
+# пользователе, COUNT, затем LIMIT или повторный запрос всех таймеров в новых
+# сессиях), для get_chat_timers с пустым кэшем чата и из ChatTimerCache
+#   python scripts/bench_get.py [chats] [timers_per_chat] [requests]
+CHATS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+TIMERS = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+REQUESTS = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+
+async def main():
+    _bench.quiet()
+    from sqlalchemy import func, select
+
+    from database.chat_timer_cache import ChatTimerCache
+    from database.db_logic import DataBaseAPI
+    from database.models import Timer, User
+    from utils.time_helper import from_timestamp, now_ts
+
+    # get_chat_timers до user-007: каждый запрос в своей сессии
+    async def legacy_get(user_id, chat_id, count):
+        now = from_timestamp(now_ts())
+        chat_filter = (Timer.chat_id == chat_id, Timer.respawn_time >= now)
+
+        async def all_timers():
+            async with db.async_session() as session:
+                result = await session.execute(select(Timer).filter(*chat_filter).order_by(Timer.respawn_time))
+                return result.scalars().all()
+
+        async with db.async_session() as session:
+            await session.execute(select(User.user_nickname, User.user_firstname).filter(User.user_id == user_id))
+        if count < 1:
+            return await all_timers()
+        async with db.async_session() as session:
+            total_count = (await session.execute(select(func.count()).select_from(Timer).filter(*chat_filter))).scalar()
+            if count < total_count:
+                result = await session.execute(
+                    select(Timer).filter(*chat_filter).order_by(Timer.respawn_time).limit(count)
+                )
+                return result.scalars().all()
+        return await all_timers()
+
+    async def cold_get(user_id, chat_id, count):
+        db.chat_timers = ChatTimerCache(CHATS)
+        return await db.get_chat_timers(user_id, chat_id, count)
+
+    db = DataBaseAPI()
+    try:
+        await _bench.setup_database(db)
+        now = now_ts()
+        names = _bench.boss_names(TIMERS)
+        for chat in range(CHATS):
+            assert await db.add_timers("bench", f"chat{chat}", {
+                boss_name: from_timestamp(now + 60 * (timer + 1)) for timer, boss_name in enumerate(names)
+            })
+
+        counts = _bench.count_round_trips(db.engine)
+        for title, get, count in (
+            ("/get before user-007", legacy_get, 0),
+            ("/get 5 before user-007", legacy_get, 5),
+            (f"/get {TIMERS} before user-007", legacy_get, TIMERS),
+            ("/get from database", cold_get, 0),
+            ("/get 5 from database", cold_get, 5),
+            ("/get from cache", db.get_chat_timers, 0),
+            ("/get 5 from cache", db.get_chat_timers, 5),
+        ):
+            # Прогрев: в режимах кэша замеряются только попадания
+            for chat in range(CHATS):
+                await get("bench", f"chat{chat}", count)
+            samples = []
+            counts.clear()
+            for request in range(REQUESTS):
+                chat_id = f"chat{request % CHATS}"
+                started = time.perf_counter()
+                rows = await get("bench", chat_id, count)
+                samples.append(time.perf_counter() - started)
+                assert len(rows) == (count or TIMERS)
+            _bench.report(title, samples)
+            print(f"{'':<40} {counts['statements'] / REQUESTS:.1f} statements, "
+                  f"{counts['checkouts'] / REQUESTS:.1f} connection checkouts per request")
+    finally:
+        await db.engine.dispose()
+        await db.write_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
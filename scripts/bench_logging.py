@@ -0,0 +1,60 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import _bench
+
+# Задержка event loop, пока бот пишет логи: таймер на 1 мс и поток записей
+# через настоящие синки utils/logger. Сравнивает LOG_ENQUEUE=0 и 1, каждый
+# режим в отдельном процессе; логи уходят в /dev/null и во временный каталог
+#   python scripts/bench_logging.py [records_per_second] [seconds]
+RATE = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+DURATION = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+
+async def measure():
+    from utils.logger import backend_logger
+
+    lags = []
+    stop = time.monotonic() + DURATION
+
+    async def ticker():
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            await asyncio.sleep(0.001)
+            lags.append(time.monotonic() - started - 0.001)
+
+    async def producer():
+        sent = 0
+        while time.monotonic() < stop:
+            for _ in range(RATE // 100):
+                backend_logger.info(f"Bench record {sent}")
+                sent += 1
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(ticker(), producer())
+    _bench.report(f"loop lag, LOG_ENQUEUE={os.environ['LOG_ENQUEUE']}", lags, file=sys.stderr)
+
+
+def main():
+    if os.environ.get('BENCH_LOGGING_CHILD'):
+        os.chdir(tempfile.mkdtemp(prefix='bench-logs-'))
+        # Синк stdout пишет в fd 1, результат печатается в stderr
+        os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+        asyncio.run(measure())
+        return
+
+    print(f"{RATE} records/s for {DURATION:g}s")
+    for enqueue in ('0', '1'):
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), str(RATE), str(DURATION)],
+            env={**os.environ, 'BENCH_LOGGING_CHILD': '1', 'LOG_ENQUEUE': enqueue},
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import time
+
+import _bench
+
+# Пул соединений под нагрузкой: волны параллельных чтений таймеров чата мимо
+# кэша и метрики InstrumentedPool после каждой волны. Размер пула задаётся
+# как обычно, через DATABASE_POOL_SIZE / DATABASE_MAX_OVERFLOW в окружении
+#   python scripts/bench_pool.py [concurrency] [rounds]
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+
+async def main():
+    _bench.quiet()
+    from config import DATABASE_MAX_OVERFLOW
+    from database.db_logic import DataBaseAPI
+    from database.pool import InstrumentedPool
+    from utils.time_helper import from_timestamp, now_ts
+
+    db = DataBaseAPI()
+    try:
+        await _bench.setup_database(db)
+        now = now_ts()
+        names = _bench.boss_names(30)
+        for chat in range(20):
+            assert await db.add_timers("bench", f"chat{chat}", {
+                boss_name: from_timestamp(now + 60 * (timer + 1)) for timer, boss_name in enumerate(names)
+            })
+
+        pool = db.engine.pool
+        if not isinstance(pool, InstrumentedPool):
+            print(f"{type(pool).__name__} is not instrumented for this DATABASE_URL")
+            return
+        print(f"pool size {pool.size()}, max overflow {DATABASE_MAX_OVERFLOW}, {CONCURRENCY} concurrent reads")
+        pool.metrics.reset()
+
+        async def read(request):
+            started = time.perf_counter()
+            assert len(await db._load_chat_timers(f"chat{request % 20}")) == len(names)
+            return time.perf_counter() - started
+
+        for round_number in range(ROUNDS):
+            started = time.perf_counter()
+            samples = await asyncio.gather(*(read(request) for request in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - started
+            stats = pool.metrics.snapshot()
+            _bench.report(f"round {round_number + 1}, read latency", samples)
+            print(
+                f"{'':<40} {CONCURRENCY / elapsed:.0f} reads/s, acquire wait "
+                f"p50 {stats['p50_wait'] * 1e3:.1f} ms p99 {stats['p99_wait'] * 1e3:.1f} ms "
+                f"max {stats['max_wait'] * 1e3:.1f} ms, peak {stats['max_checked_out']} checked out, "
+                f"overflow {stats['max_overflow']}, {stats['failed']} failed"
+            )
+            pool.metrics.reset()
+    finally:
+        await db.engine.dispose()
+        await db.write_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
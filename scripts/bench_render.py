@@ -0,0 +1,32 @@
+import sys
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import _bench
+
+# Вывод HH:MM одной строки /get: DisplayZone.hh_mm для зоны без перехода на
+# летнее время, для зоны с DST и datetime.astimezone + strftime
+#   python scripts/bench_render.py [iterations]
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+
+def main():
+    from utils.time_helper import get_zone, now_ts
+
+    timestamp = now_ts()
+    for name in ('Asia/Ho_Chi_Minh', 'UTC+07:00', 'Europe/Berlin'):
+        zone, tz = get_zone(name), ZoneInfo(name) if '/' in name else None
+        print(f"{name}: {zone.hh_mm(timestamp)}")
+        _bench.report_per_call("  DisplayZone.hh_mm", _bench.per_call(lambda: zone.hh_mm(timestamp), ITERATIONS))
+        if tz is not None:
+            _bench.report_per_call(
+                "  astimezone + strftime",
+                _bench.per_call(
+                    lambda: datetime.fromtimestamp(timestamp, timezone.utc).astimezone(tz).strftime("%H:%M"),
+                    ITERATIONS,
+                ),
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import re
+import sys
+
+import _bench
+
+# Разбор входящего сообщения: CommandRouter против прежней схемы, где каждый
+# из обработчиков Telethon проверял сообщение своим regex
+#   python scripts/bench_router.py [iterations]
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+# Регулярки обработчиков из main.py до CommandRouter (Telethon проверял
+# каждую на каждом сообщении)
+LEGACY_PATTERNS = [
+    r'/bosses',
+    r'/set\s+(.+?)\s*(\d{1,2}:\d{2})?$',
+    r'/all_start',
+    r'^/delete(?!_)\s*([\w-]+)$',
+    r'/delete_all_timers',
+    r'^/get(?!_my)(?:@\w+)?(?:\s+(\d+))?$',
+    r'^/start(@\w+)?$',
+    r'^/info(@\w+)?$',
+    r'^/help(@\w+)?$',
+]
+
+MESSAGES = [
+    "hello everyone",
+    "/get",
+    "/get 5",
+    "/set Breka 12:30",
+    "/delete 1a2b3c4d-5",
+    "/bosses@bench_bot",
+    "just chatting about the raid tonight",
+    "/unknown",
+]
+
+
+def build_router():
+    from utils.command_router import CommandRouter
+
+    router = CommandRouter("bench_bot")
+
+    async def handler(event, match):
+        pass
+
+    # Те же команды и аргументы, что регистрирует main.py
+    for name, pattern in (
+        ('bosses', None),
+        ('set', r'(.+?)\s*(\d{1,2}:\d{2})?'),
+        ('all_start', None),
+        ('interval', r'(.+?)(?:\s+(\d{1,2})(?:\s+(\d{1,2}))?)?'),
+        ('timezone', r'(\S+)?'),
+        ('delete', r'([\w-]+)'),
+        ('delete_all_timers', None),
+        ('get', r'(\d+)?'),
+        ('start', r''),
+        ('info', r''),
+        ('help', r''),
+    ):
+        router.command(name, pattern)(handler)
+    return router
+
+
+def main():
+    router = build_router()
+    legacy = [re.compile(pattern) for pattern in LEGACY_PATTERNS]
+
+    def route_all():
+        for text in MESSAGES:
+            if text[:1] == '/':
+                router.resolve(text)
+
+    def legacy_all():
+        for text in MESSAGES:
+            for pattern in legacy:
+                pattern.match(text)
+
+    number = ITERATIONS // len(MESSAGES)
+    _bench.report_per_call("CommandRouter, per message", _bench.per_call(route_all, number) / len(MESSAGES))
+    _bench.report_per_call("one regex per handler, per message", _bench.per_call(legacy_all, number) / len(MESSAGES))
+
+
+if __name__ == '__main__':
+    main()
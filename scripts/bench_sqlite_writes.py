@@ -0,0 +1,54 @@
+import asyncio
+import sys
+import time
+
+import _bench
+
+# Параллельные add_timer: через единственное соединение писателя и, для
+# сравнения, через общий пул читателей, где соединения спорят за блокировку
+# записи SQLite. С DATABASE_URL на PostgreSQL оба движка совпадают
+#   python scripts/bench_sqlite_writes.py [concurrency] [rounds]
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+
+async def main():
+    _bench.quiet()
+    from database.db_logic import DataBaseAPI
+    from utils.time_helper import from_timestamp, now_ts
+
+    db = DataBaseAPI()
+    try:
+        await _bench.setup_database(db)
+        writer = db.write_session
+        respawn_time = from_timestamp(now_ts() + 3600)
+        print(f"{db.engine.url.get_backend_name()}, {CONCURRENCY} concurrent add_timer calls")
+
+        async def add(chat_id, boss_name):
+            started = time.perf_counter()
+            timer = await db.add_timer("bench", chat_id, boss_name, respawn_time)
+            return time.perf_counter() - started, bool(timer)
+
+        for title, session in (("single writer", writer), ("shared pool", db.async_session)):
+            if title == "shared pool" and db.write_engine is db.engine:
+                continue
+            db.write_session = session
+            for round_number in range(ROUNDS):
+                chat_prefix = f"{title}-{round_number}/"
+                keys = _bench.timer_keys(CONCURRENCY, chat_prefix)
+                started = time.perf_counter()
+                results = await asyncio.gather(*(add(chat_id, boss_name) for chat_id, boss_name in keys))
+                elapsed = time.perf_counter() - started
+                failed = sum(1 for _, ok in results if not ok)
+                rows = await _bench.count_timers(db, chat_prefix)
+                _bench.report(f"{title}, round {round_number + 1}", [latency for latency, _ in results])
+                print(f"{'':<40} {elapsed:.2f} s total, {failed} failed, {rows} rows")
+                assert not failed and rows == CONCURRENCY, f"{failed} add_timer calls failed, {rows} rows written"
+        db.write_session = writer
+    finally:
+        await db.engine.dispose()
+        await db.write_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+import asyncio
+import sys
+import time
+
+import _bench
+
+# Пакетная запись таймеров: параллельные add_timer, затем update_timer и
+# delete_timer части из них, без батчинга и с TIMER_WRITE_BATCH_DELAY из
+# аргументов. Печатает задержку вызовов и снимок write_metrics
+#   python scripts/bench_write_batch.py [concurrency] [delay_ms ...]
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+DELAYS = [float(delay) / 1000 for delay in sys.argv[2:]] or [0.005]
+
+
+async def main():
+    _bench.quiet()
+    from config import TIMER_WRITE_BATCH_SIZE
+    from database.db_logic import DataBaseAPI
+    from database.write_batcher import WriteBatcher
+    from utils.time_helper import from_timestamp, now_ts
+
+    db = DataBaseAPI()
+    try:
+        await _bench.setup_database(db)
+        respawn_time = from_timestamp(now_ts() + 3600)
+
+        async def timed(call):
+            started = time.perf_counter()
+            result = await call
+            return time.perf_counter() - started, result
+
+        for delay in [0.0] + DELAYS:
+            db.write_batcher = None
+            if delay > 0:
+                db.write_batcher = WriteBatcher(db.write_session, delay, TIMER_WRITE_BATCH_SIZE, db.write_metrics)
+            db.write_metrics.reset()
+            chat_prefix = f"delay-{delay}/"
+
+            started = time.perf_counter()
+            added = await asyncio.gather(*(
+                timed(db.add_timer("bench", chat_id, boss_name, respawn_time))
+                for chat_id, boss_name in _bench.timer_keys(CONCURRENCY, chat_prefix)
+            ))
+            timers = [timer for _, timer in added if timer]
+            changed = await asyncio.gather(
+                *(timed(db.update_timer(timer, from_timestamp(now_ts() + 7200))) for timer in timers[::20]),
+                *(timed(db.delete_timer("bench", timer.timer_id)) for timer in timers[10::20]),
+            )
+            elapsed = time.perf_counter() - started
+
+            stats = db.write_metrics.snapshot()
+            rows = await _bench.count_timers(db, chat_prefix)
+            _bench.report(f"delay {delay * 1000:g} ms", [latency for latency, _ in added + changed])
+            print(
+                f"{'':<40} {elapsed:.2f} s total, {stats['operations']} writes in {stats['commits']} commits, "
+                f"{stats['failed']} failed, {rows} timers left"
+            )
+            assert all(result for _, result in added + changed), "some timer writes failed"
+            assert rows == CONCURRENCY - len(timers[10::20])
+    finally:
+        await db.engine.dispose()
+        await db.write_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
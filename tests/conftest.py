@@ -0,0 +1,11 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.py читает их при импорте; в тестах нужна только БД в памяти
+os.environ.setdefault('API_ID', '0')
+os.environ.setdefault('API_HASH', 'test')
+os.environ.setdefault('BOT_TOKEN', 'test')
+os.environ['DATABASE_URL'] = 'sqlite+aiosqlite:///:memory:'
+os.environ['DATABASE_ECHO'] = ''
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from database.db_logic import DataBaseAPI, chat_timers_query, expired_timers_query
+from database.models import Base, BossRespawn, Timer
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def _explain(conn, statement) -> list[str]:
+    compiled = statement.compile(dialect=conn.dialect)
+    params = tuple(
+        value.isoformat(" ") if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    return [row[-1] for row in result]
+
+
+# Незакрытое соединение aiosqlite держит поток и не даёт pytest завершиться
+def run_with_schema(check):
+    async def run():
+        db = DataBaseAPI()
+        try:
+            async with db.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                return await check(db, conn)
+        finally:
+            await db.engine.dispose()
+
+    return asyncio.run(run())
+
+
+def query_plan(statement) -> list[str]:
+    return run_with_schema(lambda db, conn: _explain(conn, statement))
+
+
+def assert_index_search(plan: list[str], match: str | None = None):
+    timers = [step for step in plan if " timers " in f"{step} "]
+    assert timers, plan
+    for step in timers:
+        assert step.startswith("SEARCH timers USING"), plan
+        assert "INDEX" in step, plan
+        if match is not None:
+            assert match in step, plan
+
+
+def test_get_loads_chat_timers_by_index():
+    assert_index_search(query_plan(chat_timers_query("chat")))
+
+
+def test_sweeper_finds_expired_timers_by_respawn_time():
+    assert_index_search(query_plan(expired_timers_query(NOW, 100)), "ix_timers_respawn_time")
+
+
+def test_add_timer_conflict_uses_unique_index():
+    lookup = select(Timer.timer_id).filter(Timer.chat_id == "chat", Timer.boss_name == "boss")
+    assert_index_search(query_plan(lookup), "(chat_id=? AND boss_name=?)")
+
+
+def test_add_timer_upsert_matches_unique_constraint():
+    # SQLite отвергает ON CONFLICT, если под ним нет уникального индекса
+    async def check(db, conn):
+        await conn.execute(
+            BossRespawn.__table__.insert().values(boss_name="boss", time_to_respawn=1, epoch_time_to_respawn=1)
+        )
+        for timer_id in ("first", "second"):
+            await conn.execute(db._upsert(
+                Timer,
+                [Timer.chat_id, Timer.boss_name],
+                dict(timer_id=timer_id, chat_id="chat", boss_name="boss", respawn_time=NOW),
+            ))
+        return (await conn.execute(select(Timer.timer_id, func.count()).group_by(Timer.chat_id))).all()
+
+    assert run_with_schema(check) == [("second", 1)]
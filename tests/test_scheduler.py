@@ -0,0 +1,60 @@
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+from utils.coalescer import Coalescer
+from utils.scheduler import Scheduler
+
+WINDOW = 1.0
+TOLERANCE = 0.15
+
+
+# Напоминания через Scheduler и Coalescer, как в backend_logic.notify.
+# Возвращает (секунды от старта, чат, ключи) каждой отправки и число запусков задач
+def run_reminders(offsets: dict[str, tuple[str, float]], duration: float):
+    async def run():
+        sent, calls = [], Counter()
+        started = time.time()
+
+        async def flush(chat_id, keys):
+            sent.append((time.time() - started, chat_id, sorted(keys)))
+
+        coalescer = Coalescer(WINDOW, flush)
+
+        async def remind(job):
+            calls[job.key] += 1
+            await coalescer.add(job.group, job.key, expected=job.batch)
+
+        scheduler = Scheduler(max_sleep=0.1, group_window=WINDOW)
+        for key, (chat_id, offset) in offsets.items():
+            scheduler.schedule(key, started + offset, remind, group=chat_id)
+        scheduler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            await scheduler.stop()
+        return sent, calls, len(scheduler)
+
+    return asyncio.run(run())
+
+
+def test_reminders_within_window_go_out_together_at_first_deadline():
+    sent, calls, pending = run_reminders({"a1": ("a", 0.2), "a2": ("a", 0.5)}, 0.8)
+    assert sent == [(pytest.approx(0.2, abs=TOLERANCE), "a", ["a1", "a2"])]
+    assert calls == {"a1": 1, "a2": 1}
+    assert pending == 0
+
+
+def test_reminders_outside_window_or_other_chat_go_out_separately():
+    sent, calls, pending = run_reminders(
+        {"a1": ("a", 0.2), "b1": ("b", 0.5), "a2": ("a", 0.2 + WINDOW + 0.3)}, 1.8
+    )
+    assert sent == [
+        (pytest.approx(0.2, abs=TOLERANCE), "a", ["a1"]),
+        (pytest.approx(0.5, abs=TOLERANCE), "b", ["b1"]),
+        (pytest.approx(1.5, abs=TOLERANCE), "a", ["a2"]),
+    ]
+    assert calls == {"a1": 1, "b1": 1, "a2": 1}
+    assert pending == 0
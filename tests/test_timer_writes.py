@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from database.db_logic import DataBaseAPI
+from database.models import Timer
+from database.write_batcher import WriteBatcher
+from utils.time_helper import from_timestamp, now_ts
+
+
+def run_with_database(check, batch_delay: float = 0):
+    async def run():
+        db = DataBaseAPI()
+        if batch_delay:
+            db.write_batcher = WriteBatcher(db.write_session, batch_delay, 500, db.write_metrics)
+        try:
+            assert await db.create_tables()
+            assert await db.initialize_boss_respawns()
+            return await check(db)
+        finally:
+            await db.engine.dispose()
+
+    return asyncio.run(run())
+
+
+# Кэш чата и реестр таймеров должны указывать на ту же строку, что и БД,
+# в каком бы порядке ни проснулись параллельные /set одного босса
+@pytest.mark.parametrize("batch_delay", [0, 0.01])
+def test_concurrent_add_timer_keeps_caches_on_committed_row(batch_delay):
+    async def check(db):
+        await db.get_chat_timers("test", "chat", 0)
+        respawn_time = from_timestamp(now_ts() + 3600)
+        timers = await asyncio.gather(*(db.add_timer("test", "chat", "Breka", respawn_time) for _ in range(20)))
+        assert all(timers)
+
+        async with db.async_session() as session:
+            row_ids = (await session.scalars(select(Timer.timer_id).filter(Timer.chat_id == "chat"))).all()
+        cached = await db.get_chat_timers("test", "chat", 0)
+        alive_ids = [timer.timer_id for timer in timers if db.timers.is_alive(timer.timer_id)]
+        return row_ids, [row.timer_id for row in cached], alive_ids
+
+    row_ids, cached_ids, alive_ids = run_with_database(check, batch_delay)
+    assert len(row_ids) == 1
+    assert cached_ids == row_ids
+    assert alive_ids == row_ids
+
+
+def test_write_batcher_applies_after_commit_in_order_before_callers_resume():
+    async def check(db):
+        events = []
+        batcher = WriteBatcher(db.write_session, 0.01, 500, db.write_metrics)
+
+        async def write(number):
+            async def operation(session):
+                return number
+
+            await batcher.submit(operation, lambda result: events.append(("applied", result)))
+            events.append(("resumed", number))
+
+        await asyncio.gather(*(write(number) for number in range(3)))
+        return events
+
+    events = run_with_database(check)
+    assert events[:3] == [("applied", 0), ("applied", 1), ("applied", 2)]
+    assert sorted(events[3:]) == [("resumed", 0), ("resumed", 1), ("resumed", 2)]
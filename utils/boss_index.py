@@ -0,0 +1,127 @@
+import re
+from itertools import combinations
+from typing import Iterable
+
+from intervals import respawn_intervals
+
+MIN_PREFIX_LENGTH = 3
+MAX_EDIT_DISTANCE = 2
+MAX_QUERY_LENGTH = 32
+
+_not_alnum = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(name: str) -> str:
+    return _not_alnum.sub('', name.lower())
+
+
+def edit_distance(a: str, b: str) -> int:
+    # Расстояние Дамерау-Левенштейна (optimal string alignment)
+    previous_row, row = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before_previous_row, previous_row, row = previous_row, row, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], before_previous_row[j - 2] + 1)
+    return row[-1]
+
+
+def deletes(word: str, distance: int) -> set[str]:
+    result = {word}
+    for count in range(1, min(distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), count):
+            result.add(''.join(char for i, char in enumerate(word) if i not in positions))
+    return result
+
+
+# Индекс имён боссов: точные имена, алиасы (аббревиатуры, слитное написание)
+# и уникальные префиксы ищутся в словаре за O(1), опечатки - через словарь
+# удалений (SymSpell), без перебора всех боссов на каждую команду
+class BossNameIndex:
+    def __init__(self, names: Iterable[str] = (), aliases: dict[str, str] | None = None):
+        self._names: set[str] = set()
+        self._exact: dict[str, str] = {}
+        self._prefixes: dict[str, list[str]] = {}
+        self._deletes: dict[str, set[str]] = {}
+        self._aliases = dict(aliases or {})
+        self.update(names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def update(self, names: Iterable[str]):
+        new_names = set(names) - self._names
+        if not new_names:
+            return
+        self._names |= new_names
+        self._rebuild()
+
+    def replace(self, names: Iterable[str]):
+        names = set(names)
+        if names == self._names:
+            return
+        self._names = names
+        self._rebuild()
+
+    def _rebuild(self):
+        exact, prefixes, fuzzy = {}, {}, {}
+        generated: dict[str, str | None] = {}
+
+        for name in self._names:
+            key = normalize(name)
+            exact[key] = name
+            for length in range(MIN_PREFIX_LENGTH, len(key)):
+                prefixes.setdefault(key[:length], []).append(name)
+            for variant in deletes(key, MAX_EDIT_DISTANCE):
+                fuzzy.setdefault(variant, set()).add(name)
+
+            words = name.split()
+            if len(words) > 1:
+                initials = normalize(''.join(word[0] for word in words))
+                generated[initials] = name if generated.get(initials, name) == name else None
+
+        for alias, name in generated.items():
+            if name is not None and alias not in exact:
+                exact[alias] = name
+        for alias, name in self._aliases.items():
+            if name in self._names:
+                exact[normalize(alias)] = name
+
+        self._exact, self._prefixes, self._deletes = exact, prefixes, fuzzy
+
+    def resolve(self, query: str) -> tuple[str | None, list[str]]:
+        key = normalize(query)[:MAX_QUERY_LENGTH]
+        if not key:
+            return None, []
+
+        name = self._exact.get(key)
+        if name is not None:
+            return name, []
+
+        candidates = self._prefixes.get(key)
+        if candidates is not None:
+            return (candidates[0], []) if len(candidates) == 1 else (None, sorted(candidates))
+
+        distances: dict[str, int] = {}
+        for variant in deletes(key, MAX_EDIT_DISTANCE):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate not in distances:
+                    distances[candidate] = edit_distance(key, normalize(candidate))
+
+        suggestions = sorted(
+            (distance, candidate) for candidate, distance in distances.items()
+            if distance <= MAX_EDIT_DISTANCE
+        )
+        if not suggestions:
+            return None, []
+        if suggestions[0][0] == 1 and (len(suggestions) == 1 or suggestions[1][0] > 1):
+            return suggestions[0][1], []
+        return None, [candidate for _, candidate in suggestions[:3]]
+
+
+boss_index = BossNameIndex(respawn_intervals)
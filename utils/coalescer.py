@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Batch:
+    def __init__(self, expected: int):
+        self.items: list = []
+        self.expected = expected
+        self.future = asyncio.get_running_loop().create_future()
+        self.drain: asyncio.Task | None = None
+
+
+# Собирает элементы с одинаковым ключом и отдаёт их одной пачкой. Пачка
+# уходит сразу, как только пришли все expected элементов (например, все
+# задачи чата из одного прохода планировщика); окно - лишь верхняя граница
+# ожидания отстающих. Все, кто добавил элемент, ждут результата общей отправки
+class Coalescer:
+    def __init__(self, window: float, flush: Callable[[Hashable, list], Awaitable[Any]]):
+        self._window = window
+        self._flush = flush
+        self._batches: dict[Hashable, _Batch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._batches)
+
+    async def add(self, key: Hashable, item, expected: int = 1):
+        batch = self._open(key, expected)
+        batch.items.append(item)
+        future = batch.future
+        self._check(key, batch)
+        return await asyncio.shield(future)
+
+    # Ожидавшийся элемент не придёт (например, таймер уже удалён)
+    def skip(self, key: Hashable, expected: int = 1):
+        batch = self._open(key, expected)
+        batch.expected -= 1
+        self._check(key, batch)
+
+    def _open(self, key: Hashable, expected: int) -> _Batch:
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(expected)
+            batch.drain = self._spawn(self._drain(key, batch, self._window))
+        return batch
+
+    def _check(self, key: Hashable, batch: _Batch):
+        if len(batch.items) < batch.expected:
+            return
+        batch.drain.cancel()
+        self._spawn(self._drain(key, batch, 0))
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _drain(self, key: Hashable, batch: _Batch, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        if self._batches.get(key) is not batch:
+            return
+        del self._batches[key]
+        if not batch.items:
+            batch.future.set_result(None)
+            return
+        try:
+            result = await self._flush(key, batch.items)
+        except Exception as e:
+            batch.future.set_exception(e)
+        else:
+            batch.future.set_result(result)
@@ -0,0 +1,54 @@
+import re
+from typing import Awaitable, Callable
+
+Handler = Callable[..., Awaitable[None]]
+
+
+# Один обработчик на все команды: дешёвая проверка на '/', поиск команды в
+# словаре и разбор аргументов заранее скомпилированным regex только этой команды
+class CommandRouter:
+    def __init__(self, username: str | None = None):
+        self.username = username.lower() if username else None
+        self._commands: dict[str, tuple[Handler, re.Pattern | None]] = {}
+
+    def command(self, name: str, args_pattern: str | None = None):
+        compiled = re.compile(args_pattern) if args_pattern is not None else None
+
+        def decorator(handler: Handler) -> Handler:
+            self._commands[name] = (handler, compiled)
+            return handler
+
+        return decorator
+
+    @staticmethod
+    def is_command(event) -> bool:
+        return event.raw_text[:1] == '/'
+
+    def resolve(self, text: str) -> tuple[Handler, re.Match | None] | None:
+        parts = text.split(maxsplit=1)
+        if not parts or parts[0][:1] != '/':
+            return None
+
+        name, _, mention = parts[0][1:].partition('@')
+        if mention and self.username and mention.lower() != self.username:
+            return None
+
+        command = self._commands.get(name.lower())
+        if command is None:
+            return None
+
+        handler, pattern = command
+        if pattern is None:
+            return handler, None
+
+        match = pattern.fullmatch(parts[1].strip() if len(parts) > 1 else '')
+        if match is None:
+            return None
+        return handler, match
+
+    async def dispatch(self, event):
+        resolved = self.resolve(event.raw_text)
+        if resolved is None:
+            return
+        handler, match = resolved
+        await handler(event, match)
@@ -1,45 +1,129 @@
-from loguru import logger
-import sys
-import os
-
-logger.remove()
-
-os.makedirs("logs", exist_ok=True)
-
-backend_logger = logger.bind(name="BACKEND")
-logger.add(
-    sys.stdout,
-    format="<white>BACKEND</white>"
-           " | <white>{time:YYYY-MM-DD HH:mm:ss}</white>"
-           " | <level>{level: <8}</level>"
-           " - <white><b>{message}</b></white>",
-    filter=lambda record: record["extra"].get("name") == "BACKEND"
-)
-logger.add(
-    "logs/backend.log",
-    format="<white>BACKEND</white>"
-           " | <white>{time:YYYY-MM-DD HH:mm:ss}</white>"
-           " | <level>{level: <8}</level>"
-           " - <white><b>{message}</b></white>",
-    rotation="100 MB",
-    filter=lambda record: record["extra"].get("name") == "BACKEND"
-)
-
-database_logger = logger.bind(name="DATABASE")
-logger.add(
-    sys.stdout,
-    format="<white>DATABASE</white>"
-           " | <white>{time:YYYY-MM-DD HH:mm:ss}</white>"
-           " | <level>{level: <8}</level>"
-           " - <white><b>{message}</b></white>",
-    filter=lambda record: record["extra"].get("name") == "DATABASE"
-)
-logger.add(
-    "logs/database.log",
-    format="<white>DATABASE</white>"
-           " | <white>{time:YYYY-MM-DD HH:mm:ss}</white>"
-           " | <level>{level: <8}</level>"
-           " - <white><b>{message}</b></white>",
-    rotation="100 MB",
-    filter=lambda record: record["extra"].get("name") == "DATABASE"
-)
+from loguru import logger
+import sys
+import os
+import threading
+import time
+
+from config import (
+    LOG_ENQUEUE,
+    LOG_BATCH_SIZE,
+    LOG_FLUSH_INTERVAL,
+    LOG_ROTATION_BYTES,
+    LOG_SAMPLE_THRESHOLD,
+    LOG_SAMPLE_RATE,
+)
+
+logger.remove()
+
+os.makedirs("logs", exist_ok=True)
+
+LOG_FORMAT = (
+    "<white>{extra[name]}</white>"
+    " | <white>{time:YYYY-MM-DD HH:mm:ss}</white>"
+    " | <level>{level: <8}</level>"
+    " - <white><b>{message}</b></white>"
+)
+SAMPLED_LEVELS = {"TRACE", "DEBUG", "SUCCESS"}
+
+
+# Под нагрузкой (больше LOG_SAMPLE_THRESHOLD записей в секунду) пропускает
+# только каждую LOG_SAMPLE_RATE-ю запись болтливых уровней. Один и тот же
+# record приходит во все sink'и подряд, поэтому решение запоминается
+class LoadSampler:
+    def __init__(self, threshold: int, rate: int):
+        self._threshold = threshold
+        self._rate = max(rate, 1)
+        self._second = 0
+        self._count = 0
+        self._record = None
+        self._decision = True
+
+    def __call__(self, record) -> bool:
+        if record is self._record:
+            return self._decision
+        self._record = record
+
+        if record["level"].name not in SAMPLED_LEVELS:
+            self._decision = True
+            return True
+
+        second = int(time.monotonic())
+        if second != self._second:
+            self._second = second
+            self._count = 0
+        self._count += 1
+        self._decision = self._count <= self._threshold or self._count % self._rate == 0
+        return self._decision
+
+
+# Файловый sink: раскладывает записи по logs/<name>.log и пишет пачками,
+# по LOG_BATCH_SIZE строк или раз в LOG_FLUSH_INTERVAL секунд
+class BatchedFileRouter:
+    def __init__(self, directory: str, batch_size: int, flush_interval: float, rotation_bytes: int):
+        self._directory = directory
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._rotation_bytes = rotation_bytes
+        self._buffers: dict[str, list[str]] = {}
+        self._files = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def write(self, message):
+        name = message.record["extra"].get("name", "app").lower()
+        with self._lock:
+            self._buffers.setdefault(name, []).append(message)
+            self._pending += 1
+            if self._pending >= self._batch_size:
+                self._flush()
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            self._flush()
+            for file in self._files.values():
+                file.close()
+            self._files.clear()
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self._flush_interval):
+            with self._lock:
+                self._flush()
+
+    def _flush(self):
+        for name, lines in self._buffers.items():
+            if not lines:
+                continue
+            file = self._file(name)
+            file.write("".join(lines))
+            file.flush()
+            lines.clear()
+            if file.tell() >= self._rotation_bytes:
+                self._rotate(name)
+        self._pending = 0
+
+    def _file(self, name: str):
+        file = self._files.get(name)
+        if file is None:
+            file = self._files[name] = open(
+                os.path.join(self._directory, f"{name}.log"), "a", encoding="utf-8"
+            )
+        return file
+
+    def _rotate(self, name: str):
+        self._files.pop(name).close()
+        path = os.path.join(self._directory, f"{name}.log")
+        os.rename(path, os.path.join(self._directory, f"{name}.{time.strftime('%Y-%m-%d_%H-%M-%S')}.log"))
+
+
+sampler = LoadSampler(LOG_SAMPLE_THRESHOLD, LOG_SAMPLE_RATE)
+file_router = BatchedFileRouter("logs", LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_ROTATION_BYTES)
+
+logger.add(sys.stdout, format=LOG_FORMAT, filter=sampler, enqueue=LOG_ENQUEUE)
+logger.add(file_router, format=LOG_FORMAT, filter=sampler, enqueue=LOG_ENQUEUE, colorize=False)
+
+backend_logger = logger.bind(name="BACKEND")
+database_logger = logger.bind(name="DATABASE")
@@ -0,0 +1,213 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from telethon.errors import FloodWaitError
+
+from utils.logger import backend_logger
+
+PRIORITY_RESPAWN = 0
+PRIORITY_WARNING = 1
+PRIORITY_REPLY = 2
+
+
+@dataclass(eq=False)
+class OutboundMessage:
+    chat_id: int
+    text: str
+    reply_to: int | None
+    priority: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class QueueMetrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sent = 0
+        self.failed = 0
+        self.flood_waits = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def observe(self, latency: float):
+        self.sent += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def snapshot(self) -> dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "flood_waits": self.flood_waits,
+            "avg_latency": self.total_latency / self.sent if self.sent else 0.0,
+            "max_latency": self.max_latency,
+        }
+
+
+# Все исходящие сообщения бота проходят через одну очередь с приоритетами:
+# общий и по-чатовые token bucket'ы, пауза всей очереди при FloodWait
+class OutboundQueue:
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: float,
+        chat_rate: float,
+        chat_burst: float,
+        metrics_interval: float = 60,
+    ):
+        self._global = TokenBucket(global_rate, global_burst)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: dict[int, TokenBucket] = {}
+        self._ready: list[tuple[int, int, OutboundMessage]] = []
+        self._deferred: list[tuple[float, int, OutboundMessage]] = []
+        self._counter = itertools.count()
+        self._paused_until = 0.0
+        self._client = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._sending: set[asyncio.Task] = set()
+        self.metrics = QueueMetrics()
+        self._metrics_interval = metrics_interval
+        self._reported_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._ready) + len(self._deferred)
+
+    def bind(self, client):
+        self._client = client
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        elif self._ready:
+            self._wakeup.set()
+
+    async def send(self, chat_id, text: str, reply_to: int | None = None, priority: int = PRIORITY_REPLY):
+        message = OutboundMessage(
+            chat_id=int(chat_id),
+            text=text,
+            reply_to=reply_to,
+            priority=priority,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._push(message, next(self._counter))
+        return await message.future
+
+    async def reply(self, event, text: str, priority: int = PRIORITY_REPLY):
+        return await self.send(event.chat_id, text, reply_to=event.id, priority=priority)
+
+    def _push(self, message: OutboundMessage, seq: int):
+        heapq.heappush(self._ready, (message.priority, seq, message))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _release_deferred(self, now: float):
+        while self._deferred and self._deferred[0][0] <= now:
+            _, seq, message = heapq.heappop(self._deferred)
+            heapq.heappush(self._ready, (message.priority, seq, message))
+
+    async def _wait(self, timeout: float | None):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            self._report(now)
+
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._release_deferred(now)
+            if not self._ready or self._client is None:
+                timeout = self._deferred[0][0] - now if self._deferred else None
+                await self._wait(timeout)
+                continue
+
+            priority, seq, message = heapq.heappop(self._ready)
+            bucket = self._chats.get(message.chat_id)
+            if bucket is None:
+                bucket = self._chats[message.chat_id] = TokenBucket(self._chat_rate, self._chat_burst)
+
+            chat_delay = bucket.delay(now)
+            if chat_delay > 0:
+                heapq.heappush(self._deferred, (now + chat_delay, seq, message))
+                continue
+
+            global_delay = self._global.delay(now)
+            if global_delay > 0:
+                heapq.heappush(self._ready, (priority, seq, message))
+                await asyncio.sleep(global_delay)
+                continue
+
+            self._global.consume(now)
+            bucket.consume(now)
+            task = asyncio.create_task(self._deliver(message, seq))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _deliver(self, message: OutboundMessage, seq: int):
+        try:
+            result = await self._client.send_message(message.chat_id, message.text, reply_to=message.reply_to)
+        except FloodWaitError as e:
+            self.metrics.flood_waits += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + e.seconds)
+            backend_logger.warning(f"FloodWait {e.seconds} giây, tạm dừng gửi tin nhắn")
+            self._push(message, seq)
+        except Exception as e:
+            self.metrics.failed += 1
+            if not message.future.done():
+                message.future.set_exception(e)
+        else:
+            self.metrics.observe(time.monotonic() - message.enqueued_at)
+            if not message.future.done():
+                message.future.set_result(result)
+
+    def _report(self, now: float):
+        if now - self._reported_at < self._metrics_interval:
+            return
+        self._reported_at = now
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.is_full(now)]:
+            del self._chats[chat_id]
+
+        if self.metrics.sent or self.metrics.failed:
+            stats = self.metrics.snapshot()
+            backend_logger.info(
+                f"Hàng đợi gửi tin: đã gửi {stats['sent']}, lỗi {stats['failed']}, "
+                f"FloodWait {stats['flood_waits']}, độ trễ TB {stats['avg_latency']:.2f}s, "
+                f"tối đa {stats['max_latency']:.2f}s, đang chờ {len(self)}"
+            )
+            self.metrics.reset()
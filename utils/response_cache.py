@@ -0,0 +1,25 @@
+from typing import Hashable
+
+from utils.lru_cache import LRUCache
+
+
+# Готовые тексты ответов бота. Запись действительна, пока версия данных,
+# из которых она построена, совпадает с переданной при чтении
+class ResponseCache:
+    def __init__(self, maxsize: int):
+        self._entries = LRUCache(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Hashable) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, text: str):
+        self._entries.set(key, (version, text))
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key)
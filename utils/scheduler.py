@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import itertools
+from collections import Counter
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from utils.logger import backend_logger
+
+
+# Насколько позже срока напоминание реально ушло в чат: observe вызывает
+# отправитель после доставки, а планировщик только печатает сводку
+class DriftMetrics:
+    def __init__(self, bound: float):
+        self.bound = bound
+        self.reset()
+
+    def reset(self):
+        self.observed = 0
+        self.out_of_bound = 0
+        self.total_drift = 0.0
+        self.max_drift = 0.0
+        self.clock_jumps = 0
+
+    def observe(self, drift: float):
+        self.observed += 1
+        self.total_drift += abs(drift)
+        self.max_drift = max(self.max_drift, abs(drift))
+        if abs(drift) > self.bound:
+            self.out_of_bound += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "observed": self.observed,
+            "out_of_bound": self.out_of_bound,
+            "avg_drift": self.total_drift / self.observed if self.observed else 0.0,
+            "max_drift": self.max_drift,
+            "clock_jumps": self.clock_jumps,
+        }
+
+
+@dataclass(eq=False)
+class ScheduledJob:
+    key: str
+    fire_at: float
+    callback: Callable[["ScheduledJob"], Awaitable[Any]]
+    group: str | None = None
+    payload: Any = None
+    cancelled: bool = field(default=False, repr=False)
+    # Сколько задач той же группы сработало в одном проходе вместе с этой
+    batch: int = field(default=1, repr=False)
+    # Отдана на выполнение и с тех пор не переносилась
+    dispatched: bool = field(default=False, repr=False)
+
+
+# Один диспетчер на все отложенные действия: min-heap по абсолютному времени
+# срабатывания (epoch seconds), отменённые задачи выбрасываются лениво.
+# Цикл спит по монотонным часам не дольше max_sleep и после каждого
+# пробуждения заново сверяется с настенными, поэтому скачки времени (NTP,
+# сон машины) не откладывают срабатывания больше чем на max_sleep.
+# Задачи группы, срок которых наступит в пределах group_window от первой
+# сработавшей задачи группы, выполняются в том же проходе
+class Scheduler:
+    def __init__(
+        self,
+        max_sleep: float = 1.0,
+        drift_bound: float = 1.0,
+        metrics_interval: float = 60,
+        group_window: float = 0,
+    ):
+        self._heap: list[tuple[float, int, ScheduledJob]] = []
+        self._jobs: dict[str, ScheduledJob] = {}
+        self._groups: dict[str, set[str]] = {}
+        self._counter = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        self._max_sleep = max_sleep
+        self._group_window = group_window
+        self.metrics = DriftMetrics(drift_bound)
+        self._metrics_interval = metrics_interval
+        self._reported_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._jobs
+
+    def get(self, key: str) -> ScheduledJob | None:
+        return self._jobs.get(key)
+
+    def schedule(self, key: str, fire_at: float, callback, group: str | None = None, payload=None) -> ScheduledJob:
+        self.cancel(key)
+        job = ScheduledJob(key=key, fire_at=fire_at, callback=callback, group=group, payload=payload)
+        self._jobs[key] = job
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+        self._push(job)
+        return job
+
+    def reschedule(self, job: ScheduledJob, fire_at: float) -> bool:
+        if job.cancelled or self._jobs.get(job.key) is not job:
+            return False
+        if job.fire_at != fire_at:
+            job.fire_at = fire_at
+            job.dispatched = False
+            self._push(job)
+        return True
+
+    def cancel(self, key: str) -> bool:
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return False
+        job.cancelled = True
+        if job.group is not None:
+            keys = self._groups.get(job.group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[job.group]
+        return True
+
+    def cancel_group(self, group: str) -> int:
+        keys = list(self._groups.get(group, ()))
+        for key in keys:
+            self.cancel(key)
+        return len(keys)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            backend_logger.info("Bộ lập lịch đã khởi động")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _push(self, job: ScheduledJob):
+        heapq.heappush(self._heap, (job.fire_at, next(self._counter), job))
+        if self._wakeup is not None and self._heap[0][2] is job:
+            self._wakeup.set()
+
+    def _pop_due(self, now: float) -> list[ScheduledJob]:
+        due = []
+        while self._heap:
+            fire_at, _, job = self._heap[0]
+            if job.cancelled or job.fire_at != fire_at or job.dispatched:
+                heapq.heappop(self._heap)
+                continue
+            if fire_at > now:
+                break
+            heapq.heappop(self._heap)
+            job.dispatched = True
+            due.append(job)
+        return due
+
+    # Задачи групп из due, которые наступят не позже group_window после первой
+    # сработавшей задачи группы. Их записи в куче выбрасываются позже, по dispatched
+    def _pull_group_mates(self, due: list[ScheduledJob]) -> list[ScheduledJob]:
+        if not self._group_window:
+            return []
+        first: dict[str, float] = {}
+        for job in due:
+            if job.group is not None:
+                first[job.group] = min(first.get(job.group, job.fire_at), job.fire_at)
+
+        pulled = []
+        for group, fire_at in first.items():
+            for key in self._groups.get(group, ()):
+                job = self._jobs[key]
+                if not job.dispatched and job.fire_at <= fire_at + self._group_window:
+                    job.dispatched = True
+                    pulled.append(job)
+        pulled.sort(key=lambda job: job.fire_at)
+        return pulled
+
+    async def _run(self):
+        wall, monotonic = time.time(), time.monotonic()
+        while True:
+            previous_wall, previous_monotonic = wall, monotonic
+            wall, monotonic = time.time(), time.monotonic()
+            jump = (wall - previous_wall) - (monotonic - previous_monotonic)
+            if abs(jump) > self.metrics.bound:
+                self.metrics.clock_jumps += 1
+                backend_logger.warning(f"Đồng hồ hệ thống nhảy {jump:+.1f} giây")
+            self._report(monotonic)
+
+            due = self._pop_due(wall)
+            due += self._pull_group_mates(due)
+            groups = Counter(job.group for job in due if job.group is not None)
+            for job in due:
+                job.batch = groups[job.group] if job.group is not None else 1
+                task = asyncio.create_task(self._fire(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            timeout = self._max_sleep
+            if self._heap:
+                timeout = min(timeout, max(self._heap[0][0] - time.time(), 0))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _report(self, now: float):
+        if now - self._reported_at < self._metrics_interval:
+            return
+        self._reported_at = now
+        if self.metrics.observed or self.metrics.clock_jumps:
+            stats = self.metrics.snapshot()
+            backend_logger.info(
+                f"Bộ lập lịch: đã gửi {stats['observed']} nhắc nhở, lệch TB {stats['avg_drift']:.3f}s, "
+                f"tối đa {stats['max_drift']:.3f}s, vượt ±{self.metrics.bound:g}s: {stats['out_of_bound']}, "
+                f"nhảy đồng hồ: {stats['clock_jumps']}"
+            )
+            self.metrics.reset()
+
+    async def _fire(self, job: ScheduledJob):
+        try:
+            await job.callback(job)
+        except Exception as e:
+            backend_logger.error(f"Lỗi khi thực thi tác vụ hẹn giờ {job.key}: {e}")
+        finally:
+            # Колбэк не перенёс задачу - она выполнена
+            if not job.cancelled and self._jobs.get(job.key) is job and job.dispatched:
+                self.cancel(job.key)
@@ -1,21 +1,84 @@
-from datetime import datetime, timedelta
-import pytz
-from tzlocal import get_localzone
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-moscow_tz = pytz.timezone("Asia/Ho_Chi_Minh")
-system_tz = pytz.timezone(str(get_localzone()))
+DAY = 86400
 
+_utc_offset = re.compile(r'(?:UTC|GMT)?\s*([+-])(\d{1,2})(?::?(\d{2}))?', re.IGNORECASE)
 
-def user_to_system_tz(user_time: datetime):
-    user_time = moscow_tz.localize(user_time)
-    system_time = user_time.astimezone(system_tz)
-    return system_time
 
-def system_to_user_tz(system_time: datetime):
-    user_time = system_time.astimezone(moscow_tz)
-    return user_time.strftime("%H:%M")
+# Внутри бота время - UTC epoch seconds, в часовой пояс пользователя
+# переводится только при выводе
+def now_ts() -> float:
+    return time.time()
 
-def seconds_to_hh_mm(seconds: timedelta):
+
+def to_timestamp(moment: datetime) -> float:
+    # SQLite возвращает naive datetime, в БД всегда пишется UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def from_timestamp(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _fixed_offset(tz) -> int | None:
+    now = datetime.now(timezone.utc)
+    offsets = {tz.utcoffset(now + timedelta(days=30 * month)) for month in range(13)}
+    if len(offsets) != 1:
+        return None
+    return int(offsets.pop().total_seconds())
+
+
+# Часовой пояс для вывода. Пояса без перехода на летнее время (как
+# Asia/Ho_Chi_Minh) сводятся к постоянному смещению и считаются без datetime
+class DisplayZone:
+    def __init__(self, name: str, tz):
+        self.name = name
+        self._tz = tz
+        self._offset = _fixed_offset(tz)
+
+    def offset(self, timestamp: float) -> int:
+        if self._offset is not None:
+            return self._offset
+        return int(self._tz.utcoffset(from_timestamp(timestamp)).total_seconds())
+
+    def hh_mm(self, timestamp: float) -> str:
+        seconds = int(timestamp + self.offset(timestamp)) % DAY
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+    def today_at(self, hour: int, minute: int, now: float) -> float:
+        local_now = now + self.offset(now)
+        local_moment = local_now - local_now % DAY + hour * 3600 + minute * 60
+        return local_moment - self.offset(local_moment - self.offset(now))
+
+
+@lru_cache(maxsize=1024)
+def get_zone(name: str) -> DisplayZone | None:
+    match = _utc_offset.fullmatch(name.strip())
+    if match:
+        sign, hours, minutes = match.group(1), int(match.group(2)), int(match.group(3) or 0)
+        if hours > 14 or minutes >= 60:
+            return None
+        offset = timedelta(hours=hours, minutes=minutes) * (-1 if sign == '-' else 1)
+        return DisplayZone(f"UTC{sign}{hours:02d}:{minutes:02d}", timezone(offset))
+    try:
+        return DisplayZone(name, ZoneInfo(name))
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def seconds_to_hh_mm(seconds: float):
     hours, remainder = divmod(seconds, 3600)
     minutes, _ = divmod(remainder, 60)
     return f"{int(hours):02d}:{int(minutes):02d}"
+
+
+def next_occurrence(anchor: float, period: float | None, now: float) -> float:
+    if period is None or anchor >= now:
+        return anchor
+    return anchor + period * -((anchor - now) // period)